@@ -0,0 +1,70 @@
+import os
+import numpy as np
+
+from Shape import Shape
+
+
+def packArrays(arrays):
+    """
+    Returns the (n, 4) node arrays in arrays as one (sum n, 4) array
+    and an array of their lengths
+    """
+
+    lengths = np.array([len(array) for array in arrays], dtype=np.int64)
+    if not arrays:
+        return np.zeros((0, 4)), lengths
+    return np.concatenate(arrays), lengths
+
+
+def unpackArrays(nodes, lengths):
+    "Returns the node arrays that packArrays packed"
+
+    return np.split(nodes, np.cumsum(lengths)[:-1]) if len(lengths) else []
+
+
+def saveCheckpoint(filename, gen, population, halloffame, parentsValid):
+    """
+    Saves the state of evolve after generation gen to the .npz file
+    filename: the population, the hall of fame, the validity of the
+    population and the state of np.random.
+    The file is replaced in one go, so a crash while saving leaves
+    the last checkpoint as it was.
+    """
+
+    populationNodes, populationLengths = packArrays(
+        [shape.toArray() for shape in population])
+    hofNodes, hofLengths = packArrays(
+        [shape.toArray() for shape in halloffame])
+    name, keys, pos, hasGauss, cachedGaussian = np.random.get_state()
+
+    temporary = filename + '.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez(f, generation=gen,
+                 populationNodes=populationNodes,
+                 populationLengths=populationLengths,
+                 hofNodes=hofNodes, hofLengths=hofLengths,
+                 parentsValid=parentsValid,
+                 randomName=name, randomKeys=keys, randomPos=pos,
+                 randomHasGauss=hasGauss,
+                 randomCachedGaussian=cachedGaussian)
+    os.replace(temporary, filename)
+
+
+def loadCheckpoint(filename):
+    """
+    Loads a checkpoint saved by saveCheckpoint, setting the state
+    of np.random to the one saved.
+    Returns (gen, population, halloffame, parentsValid)
+    """
+
+    with np.load(filename) as data:
+        np.random.set_state((str(data['randomName']), data['randomKeys'],
+                             int(data['randomPos']),
+                             int(data['randomHasGauss']),
+                             float(data['randomCachedGaussian'])))
+        population = [Shape.fromArray(array) for array in unpackArrays(
+            data['populationNodes'], data['populationLengths'])]
+        halloffame = [Shape.fromArray(array) for array in unpackArrays(
+            data['hofNodes'], data['hofLengths'])]
+        return (int(data['generation']), population, halloffame,
+                bool(data['parentsValid']))
@@ -0,0 +1,154 @@
+import numpy as np
+
+from Occupancy import Occupancy
+from ShapeValidTest import isInBoundsBatch
+from ShapeValidTest import nodePositions
+from ShapeValidTest import startPos
+from Telemetry import telemetry
+
+
+# The six neighbours of a cell, one step along x, y or rotation
+neighbourSteps = np.array([[1, 0, 0], [-1, 0, 0], [0, 1, 0],
+                           [0, -1, 0], [0, 0, 1], [0, 0, -1]])
+
+# Shapes with at least this many nodes are checked with an Occupancy
+# first, smaller ones are faster to check with the geometry alone
+occupancyNodes = 48
+
+
+def configGrid(shape, step=0.02, rotStep=np.pi/90,
+               rotRange=(-3*np.pi/4, np.pi/4)):
+    """
+    Returns the axes (xs, ys, rots) of a grid over the poses of shape
+    worth searching, with positions step apart and rotations
+    rotStep apart, rotation 0 included.
+    Until it is through, some part of the shape is in the lower
+    part of the corridor, so positions more than the reach of the
+    shape outside of it are left out. The lowest ys have the shape
+    just below the starting line, where the walks start.
+    """
+
+    centers, radii, _, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+    reach = np.max(np.linalg.norm(centers[inside], axis=1) + radii[inside])
+
+    # Aligned with where the walks start, against the left wall
+    start = startPos(shape, below=True)
+    left = np.floor((-0.5 - reach - start[0]) / step)
+    right = np.ceil((0.5 + reach - start[0]) / step)
+    xs = start[0] + step * np.arange(left, right + 1)
+    ys = np.arange(start[1], 0.5 + reach + step, step)
+    rots = rotStep * np.arange(np.floor(rotRange[0] / rotStep),
+                               np.ceil(rotRange[1] / rotStep) + 1)
+    return (xs, ys, rots)
+
+
+def bottomBatch(shape, poss, rots):
+    """
+    Returns the lowest point of the (inside) nodes for every pose,
+    as an array (K,), when poss is an array (K, 2) of positions
+    and rots an array (K,) of rotations.
+    The shape is through (see isThrough) where it is at least -0.5
+    """
+
+    _, radii, _, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+    bottoms = nodePositions(shape, poss, rots)[..., 1] - radii
+    return np.min(bottoms[:, inside], axis=1)
+
+
+def configSpaceSearch(shape, grid, batch=256):
+    """
+    Searches the poses of shape in grid, (xs, ys, rots) as configGrid
+    returns, that are in bounds, from the unrotated poses just below
+    the starting line, for one where the shape is through.
+    Cells are neighbours if they differ by one step along one axis.
+    The search is best first, the batch reached cells where the shape
+    is the highest up are expanded together, and their neighbours not
+    yet seen checked with one isInBoundsBatch. Cells the search never
+    gets next to are never checked, so a shape that is through early
+    only rasterizes a small part of its configuration space.
+    Shapes with at least occupancyNodes nodes are checked with an
+    Occupancy first, which gives the same verdicts.
+    Returns (isThrough, free) where isThrough is True if a pose where
+    the shape is through was reached, and free an int8 array
+    (len(xs), len(ys), len(rots)) that is 1 for cells found in bounds,
+    -1 for cells found out of bounds and 0 for cells never checked.
+    """
+
+    xs, ys, rots = grid
+    size = np.array([len(xs), len(ys), len(rots)])
+    free = np.zeros(size, dtype=np.int8)
+    occupancy = None
+    if len(shape.nodes) >= occupancyNodes:
+        occupancy = Occupancy(shape)
+
+    def check(cells):
+        """
+        Marks cells as seen, returns those in bounds and how low
+        the shape reaches in them
+        """
+
+        poss = np.stack([xs[cells[:, 0]], ys[cells[:, 1]]], axis=1)
+        inBounds = isInBoundsBatch(shape, poss, rots[cells[:, 2]],
+                                   occupancy)
+        free[tuple(cells.T)] = np.where(inBounds, 1, -1)
+        return (cells[inBounds],
+                bottomBatch(shape, poss[inBounds], rots[cells[inBounds, 2]]))
+
+    # Start from the row below the starting line, unrotated
+    zero = np.argmin(np.abs(rots))
+    cells, bottoms = check(np.stack(
+        [np.arange(size[0]), np.zeros(size[0], dtype=int),
+         np.full(size[0], zero)], axis=1))
+
+    while len(cells):
+        if np.max(bottoms) >= -0.5:
+            return (True, free)
+
+        # Expand the highest up cells
+        if len(cells) > batch:
+            best = np.argpartition(-bottoms, batch)[:batch]
+            rest = np.ones(len(cells), dtype=bool)
+            rest[best] = False
+            front, cells, bottoms = cells[best], cells[rest], bottoms[rest]
+        else:
+            front, cells, bottoms = cells, cells[:0], bottoms[:0]
+
+        # The neighbours not seen yet
+        neighbours = (front[:, None, :] + neighbourSteps).reshape(-1, 3)
+        neighbours = neighbours[np.all((neighbours >= 0) &
+                                       (neighbours < size), axis=1)]
+        flat = np.unique(np.ravel_multi_index(tuple(neighbours.T), size))
+        neighbours = np.stack(np.unravel_index(flat, size), axis=1)
+        neighbours = neighbours[free[tuple(neighbours.T)] == 0]
+        if len(neighbours) == 0:
+            continue
+
+        newCells, newBottoms = check(neighbours)
+        cells = np.concatenate([cells, newCells])
+        bottoms = np.concatenate([bottoms, newBottoms])
+
+    return (False, free)
+
+
+def configSpaceIsValid(shape, step=0.02, rotStep=np.pi/90,
+                       rotRange=(-3*np.pi/4, np.pi/4)):
+    """
+    Returns True if shape can be moved through a corridor with
+    width 1 and a 90 degree turn to the right, along any path,
+    as found by a flood fill of its configuration space on a grid,
+    see configGrid and configSpaceSearch.
+    Unlike shapeIsValid, this doesn't follow one path, so shapes that
+    could get through some other way than the walks go aren't rejected.
+    Only the grid poses are checked, so gaps narrower than the grid can
+    be missed or, the moves between them not being checked, jumped over.
+    Passages the walks squeeze through touching the walls have no room
+    for grid poses at any step, so no step makes it accept every shape
+    the walks do. It is a coarse cross-check of the walks only, and not
+    one of the validators the GA can use.
+    """
+
+    telemetry.count('walks')
+    return configSpaceSearch(shape, configGrid(shape, step, rotStep,
+                                               rotRange))[0]
@@ -0,0 +1,191 @@
+import numpy as np
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from Shape import Shape
+from ShapeValidTest import shapeIsValid
+from Telemetry import telemetry
+from Telemetry import withTelemetry
+
+
+def offspringFromArray(array, seed, bigMutations=False):
+    """
+    Returns the node array of an offspring of the shape with node array
+    array, with mutations drawn from np.random seeded with seed.
+    The global np.random state is left as it was.
+    """
+
+    state = np.random.get_state()
+    np.random.seed(seed)
+    try:
+        with telemetry.timer('mutation'):
+            return Shape.fromArray(array).getOffspring(bigMutations).toArray()
+    finally:
+        np.random.set_state(state)
+
+
+# The ways of checking validity, by name
+validators = {
+    'events': shapeIsValid,
+    'stepped': lambda shape, step=0.01: shapeIsValid(shape, True, step),
+}
+
+# The validators that take a step, coarser the larger it is
+stepValidators = {'stepped'}
+
+
+def getValidator(name):
+    """
+    Returns the check named name, one of validators, or one of
+    stepValidators followed by a colon and its step, such as
+    'stepped:0.05' for the stepped walk with steps of 0.05.
+    Raises ValueError if there is no such check.
+    """
+
+    base, _, step = name.partition(':')
+    if base not in validators or (step and base not in stepValidators):
+        raise ValueError(f"No validator {name!r}")
+    if not step:
+        return validators[base]
+    step = float(step)
+    if step <= 0:
+        raise ValueError(f"Step of validator {name!r} isn't positive")
+    return lambda shape: validators[base](shape, step)
+
+
+def isValidArray(array, validator='events'):
+    "Returns the verdict of validator for the shape with node array array"
+
+    with telemetry.timer('walk'):
+        return getValidator(validator)(Shape.fromArray(array))
+
+
+class Evaluator:
+    """
+    Creates offspring and checks validity for whole populations,
+    either in this process (workers=0) or spread over a pool of
+    worker processes that is reused for every call.
+
+    Shapes are sent to the workers as (n, 4) node arrays, see
+    Shape.toArray. Every offspring gets its own seed, drawn from
+    np.random in this process, so the results are the same
+    for any number of workers.
+
+    What the workers count and time is added to the telemetry
+    of this process.
+
+    If cache, a ValidityCache, is given, it is consulted before
+    any shape is walked, and the verdicts of the walks are stored in it.
+
+    validator is the name of the check that decides validity, see
+    getValidator, the event walk of shapeIsValid by default.
+    coarse and finest, if given, are the names of a cheaper check
+    that offspring are screened with before validator, and of a more
+    thorough one that the best shapes are confirmed with, see
+    nextGeneration and evolve in main.py.
+    """
+
+    def __init__(self, workers=0, cache=None, validator='events',
+                 coarse=None, finest=None):
+        for name in [validator, coarse, finest]:
+            if name is not None:
+                getValidator(name)
+        self.workers = workers
+        self.cache = cache
+        self.validator = validator
+        self.coarse = coarse
+        self.finest = finest
+        self.pool = ProcessPoolExecutor(workers) if workers > 0 else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        "Shuts down the worker processes"
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def map(self, function, *iterables):
+        "Returns list(map(function, *iterables)), run on the workers if any"
+
+        if self.pool is None:
+            return list(map(function, *iterables))
+
+        # A few chunks per worker keeps them busy without
+        # sending every shape on its own
+        length = min(len(iterable) for iterable in iterables)
+        chunksize = max(1, length // (4 * self.workers))
+        results = []
+        for result, taken in self.pool.map(withTelemetry,
+                                           [function] * length, *iterables,
+                                           chunksize=chunksize):
+            results.append(result)
+            telemetry.merge(taken)
+        return results
+
+    def getOffspring(self, shapes, bigMutations=False):
+        "Returns a list with one offspring of every shape in shapes"
+
+        seeds = np.random.randint(2**32, size=len(shapes))
+        arrays = self.map(offspringFromArray,
+                          [shape.toArray() for shape in shapes],
+                          seeds, [bigMutations] * len(shapes))
+        return [Shape.fromArray(array) for array in arrays]
+
+    def areValid(self, shapes, validator=None):
+        """
+        Returns a list with the validity of every shape in shapes,
+        checked by validator, self.validator by default.
+        The cache only holds the verdicts of self.validator.
+        """
+
+        if validator is None:
+            validator = self.validator
+        arrays = [shape.toArray() for shape in shapes]
+        names = [validator] * len(arrays)
+        if self.cache is None or validator != self.validator:
+            return self.map(isValidArray, arrays, names)
+
+        # Walk only the shapes not in the cache, and each of them once
+        keys = [self.cache.key(array) for array in arrays]
+        verdicts = {}
+        missing = {}
+        for key, array in zip(keys, arrays):
+            if key in verdicts or key in missing:
+                continue
+            entry = self.cache.get(key)
+            if entry is None:
+                missing[key] = array
+            else:
+                verdicts[key] = entry[0]
+
+        for key, isValid in zip(missing, self.map(
+                isValidArray, list(missing.values()), names)):
+            verdicts[key] = isValid
+            self.cache.set(key, isValid)
+
+        return [verdicts[key] for key in keys]
+
+    def agreement(self, shapes, names):
+        """
+        Checks shapes with every validator in names, to tune which
+        ones to use as coarse and finest checks with.
+        Returns (rates, seconds), rates a dictionary from pairs of names
+        to the fraction of shapes they agree on and seconds one from
+        names to the time they took.
+        """
+
+        verdicts = {}
+        seconds = {}
+        for name in names:
+            start = time.perf_counter()
+            verdicts[name] = np.array(self.areValid(shapes, name))
+            seconds[name] = time.perf_counter() - start
+        rates = {(a, b): float(np.mean(verdicts[a] == verdicts[b]))
+                 for a in names for b in names}
+        return (rates, seconds)
@@ -0,0 +1,119 @@
+import os
+import numpy as np
+
+from Shape import Shape
+
+
+class HallOfFameWriter:
+    """
+    Records the hall of fame to a file as the run goes.
+
+    Shapes are appended as (n, 4) node arrays (see Shape.toArray)
+    of float64 to filename, and for every shape a row
+    [generation, first row, number of rows] of int64 is appended to
+    filename + '.index'. The nodes are written before their index row,
+    so a crash can at worst leave nodes no index row points to,
+    which readers ignore.
+
+    If resume is True, the shapes already in the file are kept and new
+    ones appended after them, else the file is started over.
+    """
+
+    def __init__(self, filename, resume=False):
+        self.filename = filename
+        mode = 'ab' if resume else 'wb'
+        self.nodes = open(filename, mode)
+        self.index = open(filename + '.index', mode)
+
+        # Drop nodes of a shape whose index row was never written
+        self.rows = 0
+        entries = readIndex(filename)
+        if len(entries):
+            self.rows = int(entries[-1, 1] + entries[-1, 2])
+        self.index.truncate(len(entries) * entries.itemsize * 3)
+        self.nodes.truncate(self.rows * 4 * 8)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.nodes.close()
+        self.index.close()
+
+    def append(self, gen, shape):
+        "Appends shape, the best of generation gen"
+
+        array = np.ascontiguousarray(shape.toArray(), dtype='<f8')
+        self.nodes.write(array.tobytes())
+        self.nodes.flush()
+        self.index.write(np.array([gen, self.rows, len(array)],
+                                  dtype='<i8').tobytes())
+        self.index.flush()
+        self.rows += len(array)
+
+    def truncate(self, gen):
+        "Forgets the shapes of the generations after gen"
+
+        entries = readIndex(self.filename)
+        entries = entries[entries[:, 0] <= gen]
+        self.rows = int(entries[-1, 1] + entries[-1, 2]) if len(entries) else 0
+        self.index.truncate(len(entries) * entries.itemsize * 3)
+        self.nodes.truncate(self.rows * 4 * 8)
+
+
+def readIndex(filename):
+    "Returns the complete rows of the index of filename, as an (n, 3) array"
+
+    if not os.path.exists(filename + '.index'):
+        return np.zeros((0, 3), dtype='<i8')
+    entries = np.fromfile(filename + '.index', dtype='<i8')
+    return entries[:len(entries) // 3 * 3].reshape(-1, 3)
+
+
+class HallOfFame:
+    """
+    Reads a hall of fame recorded by HallOfFameWriter, memory mapped,
+    so only the shapes asked for are read.
+    Works as a sequence of shapes, hof[i] is the i-th shape recorded,
+    and hof.generations holds the generation of each.
+    Shapes recorded after it was opened are seen after refresh.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.refresh()
+
+    def refresh(self):
+        "Catches up with the shapes written since the file was read"
+
+        self.entries = readIndex(self.filename)
+        self.generations = self.entries[:, 0]
+        rows = int(self.entries[-1, 1] + self.entries[-1, 2]) \
+            if len(self.entries) else 0
+        # An empty file can't be memory mapped
+        if rows == 0:
+            self.nodes = np.zeros((0, 4))
+        else:
+            self.nodes = np.memmap(self.filename, dtype='<f8', mode='r',
+                                   shape=(rows, 4))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __getitem__(self, i):
+        "Returns the i-th shape recorded"
+
+        _, start, count = self.entries[i]
+        return Shape.fromArray(np.array(self.nodes[start:start + count]))
+
+    def byGeneration(self, gen):
+        "Returns the shape recorded for generation gen"
+
+        i = np.flatnonzero(self.generations == gen)
+        if len(i) == 0:
+            raise KeyError(f"No shape recorded for generation {gen}")
+        return self[i[-1]]
+
@@ -0,0 +1,264 @@
+import numpy as np
+from contourpy import contour_generator
+
+from Shape import Node
+from Shape import Shape
+from ShapeValidTest import rotatePoints
+
+
+def corridorContains(points, rot, poss, last=False):
+    """
+    Returns which of points, an array (P, 2) in the frame of the sofa,
+    are in the corridor when the sofa is rotated by rot and moved by
+    each of poss, an array (C, 2), as a boolean array (C, P).
+    If last is True, only the horizontal part of the corridor counts,
+    since the sofa leaves along it.
+    """
+
+    rotated = rotatePoints(points, rot)[0]
+    xs = rotated[:, 0] + poss[:, 0, None]
+    ys = rotated[:, 1] + poss[:, 1, None]
+    contains = (ys >= -0.5) & (ys <= 0.5) & (xs >= -0.5)
+    if not last:
+        contains |= (xs >= -0.5) & (xs <= 0.5) & (ys <= 0.5)
+    return contains
+
+
+def hammersleyPath(rots):
+    """
+    Returns the positions that move Hammersley's sofa through the
+    corridor at rotations rots, from 0 to -pi/2, as an array (K, 2).
+    Unrotated, the sofa is in the lower part of the corridor with its
+    top at the top of the corridor. The inner corner goes around the
+    semicircle of radius 2/pi cut out of its right side.
+    """
+
+    radius = 2 / np.pi
+    # Where the inner corner is in the frame of the sofa
+    corners = np.stack([0.5 - radius * np.sin(-2 * rots),
+                        -0.5 - radius + radius * np.cos(-2 * rots)], axis=1)
+    return np.array([0.5, -0.5]) - np.array(
+        [rotatePoints(corner, rot)[0]
+         for corner, rot in zip(corners, rots)])
+
+
+class Hallway:
+    """
+    The hallway formulation of the sofa problem: given how the sofa
+    moves, rotations rots from 0 to -pi/2 and a position path[k] for
+    every rotation rots[k], the largest sofa is what stays in the
+    corridor in every pose, the intersection of the corridor
+    transformed into the frame of the sofa.
+
+    The intersection is rasterized, on a grid with resolution between
+    points over the lower part of the corridor, which is where the
+    sofa is unrotated at path[0] = (0, 0). For every rotation, which
+    points are in the corridor is kept, as is for every point the
+    number of rotations it isn't in the corridor in, so moving the
+    sofa at some rotations only has those rotations recalculated.
+
+    Only the sampled rotations are checked, so the sofa is somewhat
+    larger than one that can be moved continuously.
+    """
+
+    def __init__(self, angles=32, resolution=0.01, path=None):
+        self.rots = np.linspace(0, -np.pi / 2, angles + 1)
+        self.resolution = resolution
+        # Hammersley's sofa is 2 + 4/pi long
+        self.xs = np.arange(-0.5 + resolution / 2, 0.5, resolution)
+        self.ys = np.arange(-3 + resolution / 2, 0.5, resolution)
+        xs, ys = np.meshgrid(self.xs, self.ys)
+        self.points = np.stack([xs.ravel(), ys.ravel()], axis=1)
+
+        if path is None:
+            path = hammersleyPath(self.rots)
+        self.path = np.array(path, dtype=float)
+
+        self.contains = np.ones((len(self.rots), len(self.points)),
+                                dtype=bool)
+        for k in range(1, len(self.rots)):
+            self.contains[k] = self.containsAt(k, self.path[k][None])[0]
+        self.missing = np.sum(~self.contains, axis=0)
+
+    def containsAt(self, k, poss, points=None):
+        """
+        Returns corridorContains of points, all of them by default,
+        at rotation k, for positions poss
+        """
+
+        if points is None:
+            points = self.points
+        return corridorContains(points, self.rots[k], poss,
+                                k == len(self.rots) - 1)
+
+    @property
+    def area(self):
+        return np.count_nonzero(self.missing == 0) * self.resolution**2
+
+    def sofaMask(self):
+        "Returns the raster of the sofa, an array (len(ys), len(xs))"
+
+        return (self.missing == 0).reshape(len(self.ys), len(self.xs))
+
+    def move(self, ks, deltas):
+        "Moves the sofa by deltas, an array (len(ks), 2), at rotations ks"
+
+        for k, delta in zip(ks, deltas):
+            self.path[k] += delta
+            self.missing -= ~self.contains[k]
+            self.contains[k] = self.containsAt(k, self.path[k][None])[0]
+            self.missing += ~self.contains[k]
+
+    def improve(self, width, step):
+        """
+        Tries moving the sofa around every rotation by step in one of
+        eight directions, the moves tapering off over width rotations
+        to either side so the path stays smooth, and makes every move
+        that makes the sofa larger.
+        Returns True if any move was made.
+        """
+
+        directions = np.array([[1, 0], [-1, 0], [0, 1], [0, -1],
+                               [1, 1], [1, -1], [-1, 1], [-1, -1]])
+        last = len(self.rots) - 1
+        improved = False
+        for center in range(1, last + 1, max(1, width // 2)):
+            ks = np.arange(max(1, center - width + 1),
+                           min(last, center + width - 1) + 1)
+            weights = 1 - np.abs(ks - center) / width
+
+            # Only the points the other rotations keep can change
+            kept = self.missing == np.sum(~self.contains[ks], axis=0)
+            points = self.points[kept]
+            now = np.ones(len(points), dtype=bool)
+            moved = np.ones((len(directions), len(points)), dtype=bool)
+            for k, weight in zip(ks, weights):
+                now &= self.contains[k, kept]
+                moved &= self.containsAt(
+                    k, self.path[k] + step * weight * directions, points)
+
+            counts = np.count_nonzero(moved, axis=1)
+            best = np.argmax(counts)
+            if counts[best] > np.count_nonzero(now):
+                self.move(ks, step * weights[:, None] * directions[best])
+                improved = True
+        return improved
+
+    def optimize(self, step=0.05, minStep=None, callback=None):
+        """
+        Climbs to a larger sofa by moving its path, with moves spanning
+        from all rotations down to single ones, see improve.
+        When no move of step helps, step is halved, until it is smaller
+        than minStep, a quarter of the resolution by default.
+        If callback is given, it is called with self after every step.
+        Returns the area of the sofa.
+        """
+
+        if minStep is None:
+            minStep = self.resolution / 4
+        widths = []
+        width = len(self.rots) - 1
+        while width >= 1:
+            widths.append(width)
+            width //= 2
+
+        while step >= minStep:
+            improved = False
+            for width in widths:
+                improved |= self.improve(width, step)
+            if not improved:
+                step /= 2
+            if callback is not None:
+                callback(self)
+        return self.area
+
+    def toShape(self, n=64, radius=0.02, margin=0.01, minTurn=0.1):
+        """
+        Returns a Shape fit to the sofa, with nodes of radius radius
+        along its outline, counter clockwise, see fitNodes.
+        The outline is moved in by margin, less than radius, to leave some
+        room to the walls, which a walk needs.
+        """
+
+        points = outline(self.sofaMask(), self.xs, self.ys)
+        # n points evenly spread along the outline
+        closed = np.vstack([points, points[:1]])
+        lengths = np.concatenate(
+            [[0], np.cumsum(np.linalg.norm(np.diff(closed, axis=0), axis=1))])
+        at = np.linspace(0, lengths[-1], n, endpoint=False)
+        points = np.stack([np.interp(at, lengths, closed[:, 0]),
+                           np.interp(at, lengths, closed[:, 1])], axis=1)
+        return fitNodes(points, radius, margin, minTurn)
+
+
+def turnAngles(points):
+    "Returns the angles the closed polygon points turns left by at each point"
+
+    before = points - np.roll(points, 1, axis=0)
+    after = np.roll(points, -1, axis=0) - points
+    return np.arctan2(before[:, 0] * after[:, 1] - before[:, 1] * after[:, 0],
+                      np.sum(before * after, axis=1))
+
+
+def outline(mask, xs, ys):
+    """
+    Returns the outline of the largest region of mask, a raster over
+    xs and ys, as a counter clockwise closed polygon (P, 2).
+    The mask is blurred a little first so the steps of the raster
+    don't show.
+    """
+
+    # Padded, so the outline is closed where the region reaches the edge
+    step = xs[1] - xs[0]
+    xs = np.concatenate([[xs[0] - step], xs, [xs[-1] + step]])
+    ys = np.concatenate([[ys[0] - step], ys, [ys[-1] + step]])
+    padded = np.pad(mask.astype(float), 2)
+    blurred = sum(padded[i:i + len(ys), j:j + len(xs)]
+                  for i in range(3) for j in range(3)) / 9
+
+    lines = contour_generator(xs, ys, blurred).lines(0.5)
+    points = max(lines, key=len)
+    if np.array_equal(points[0], points[-1]):
+        points = points[:-1]
+    x, y = points[:, 0], points[:, 1]
+    if np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y) < 0:
+        points = points[::-1]
+    return points
+
+
+def fitNodes(points, radius, margin=0.0, minTurn=0.1):
+    """
+    Returns a Shape with nodes of radius radius at the corners of the
+    closed polygon points, counter clockwise, with its outline
+    margin inside of the polygon.
+    Points where the polygon turns less than minTurn radians are
+    dropped, the ones turning the least first, so the straight parts
+    are binding lines. At the corners turning left are inside nodes
+    and at the ones turning right outside nodes.
+    """
+
+    points = np.array(points, dtype=float)
+    while len(points) > 3:
+        turns = np.abs(turnAngles(points))
+        least = np.argmin(turns)
+        if turns[least] >= minTurn:
+            break
+        points = np.delete(points, least, axis=0)
+
+    turns = turnAngles(points)
+    before = points - np.roll(points, 1, axis=0)
+    after = np.roll(points, -1, axis=0) - points
+    tangents = before / np.linalg.norm(before, axis=1)[:, None] + \
+        after / np.linalg.norm(after, axis=1)[:, None]
+    inwards = np.stack([-tangents[:, 1], tangents[:, 0]], axis=1)
+    inwards /= np.linalg.norm(inwards, axis=1)[:, None]
+
+    nodes = []
+    for ID, (point, turn, inward) in enumerate(zip(points, turns, inwards)):
+        if turn > 0:
+            nodes.append(Node(point + (radius + margin) * inward,
+                              radius, 1, ID))
+        else:
+            nodes.append(Node(point - (radius - margin) * inward,
+                              radius, -1, ID))
+    return Shape(nodes)
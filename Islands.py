@@ -0,0 +1,150 @@
+import contextlib
+import multiprocessing
+import os
+import sys
+import numpy as np
+from multiprocessing.connection import wait
+
+from Evaluator import Evaluator
+from Shape import Shape
+from ValidityCache import ValidityCache
+from main import evolve
+
+
+class IslandRecorder:
+    """
+    Keeps the hall of fame of an island by generation, recorded the
+    same way as with HallOfFameWriter, so the halls of fame of islands
+    can be matched up even when some generations have no shape
+    """
+
+    def __init__(self):
+        self.arrays = {}
+
+    def append(self, gen, shape):
+        self.arrays[gen] = shape.toArray()
+
+    def truncate(self, gen):
+        self.arrays = {g: a for g, a in self.arrays.items() if g <= gen}
+
+
+def runIsland(index, originalArray, N, popSize, seed, migrateEvery,
+              migrants, send, receive, results, validator='events',
+              coarse=None, finest=None):
+    """
+    Evolves one island, in its own process, for N generations.
+    Every migrateEvery generations its best migrants shapes are sent
+    to the next island with send, and the ones received from the
+    island before it with receive replace its smallest.
+    The final population and the hall of fame are sent with results,
+    as node arrays, the hall of fame as a dictionary by generation.
+    Validity is decided by validator, with the coarse and finest
+    checks if given, see Evaluator.
+    """
+
+    np.random.seed(seed)
+
+    def migrate(gen, population):
+        if send is None or (gen + 1) % migrateEvery != 0 or gen == N - 1:
+            return population
+        send.send([shape.toArray() for shape in population[:migrants]])
+        immigrants = [Shape.fromArray(array) for array in receive.recv()]
+        # Immigrants survived their own island, so they are valid
+        return population[:len(population) - len(immigrants)] + immigrants
+
+    # Only the first island tells how it's going
+    recorder = IslandRecorder()
+    with open(os.devnull, 'w') as devnull, \
+            contextlib.redirect_stdout(devnull if index > 0 else sys.stdout), \
+            ValidityCache(walker=validator) as cache, \
+            Evaluator(0, cache, validator, coarse, finest) as evaluator:
+        population, _ = evolve(Shape.fromArray(originalArray), N, popSize,
+                               evaluator, migrate=migrate, recorder=recorder)
+
+    results.send(([shape.toArray() for shape in population],
+                  recorder.arrays))
+
+
+def evolveIslands(original, N, popSize, islands, migrateEvery=10,
+                  migrants=2, validator='events', coarse=None, finest=None,
+                  recorder=None):
+    """
+    Runs the genetic algorithm on islands populations of popSize,
+    each in its own process, for N generations. They only meet when
+    migrating, every migrateEvery generations each island sends its
+    best migrants shapes to the next one, in a ring.
+    Every island gets its own seed, drawn from np.random, so the
+    results are the same every time for the same state of np.random.
+    Returns the populations of all islands together, sorted by area,
+    and the hall of fame, the best shape of any island
+    every other generation that any island recorded one for.
+    Validity is decided by validator, with the coarse and finest
+    checks if given, see Evaluator.
+    If recorder, a HallOfFameWriter, is given, the hall of fame is
+    written to it instead, and the hall of fame returned is empty.
+    Raises RuntimeError if an island process dies without its results,
+    after stopping the others.
+    """
+
+    seeds = np.random.randint(2**32, size=islands)
+
+    # Island i sends to island i + 1 over pipe i
+    pipes = [multiprocessing.Pipe(duplex=False) for _ in range(islands)]
+    resultPipes = [multiprocessing.Pipe(duplex=False) for _ in range(islands)]
+    processes = []
+    for i in range(islands):
+        send = pipes[i][1] if islands > 1 else None
+        receive = pipes[i - 1][0] if islands > 1 else None
+        process = multiprocessing.Process(
+            target=runIsland,
+            args=(i, original.toArray(), N, popSize, seeds[i], migrateEvery,
+                  migrants, send, receive, resultPipes[i][1], validator,
+                  coarse, finest))
+        process.start()
+        processes.append(process)
+        # The island has its own copies, so when it exits the pipes
+        # of this process are closed at the other end
+        resultPipes[i][1].close()
+        if islands > 1:
+            send.close()
+            receive.close()
+
+    results = [None] * islands
+    waiting = set(range(islands))
+    while waiting:
+        wait([resultPipes[i][0] for i in waiting] +
+             [processes[i].sentinel for i in waiting])
+        for i in sorted(waiting):
+            try:
+                if resultPipes[i][0].poll():
+                    results[i] = resultPipes[i][0].recv()
+                    waiting.remove(i)
+                    continue
+                if processes[i].is_alive():
+                    continue
+            except EOFError:
+                # Closed without results, the island is gone
+                pass
+            # The others could be waiting for its migrants forever
+            for process in processes:
+                process.terminate()
+                process.join()
+            raise RuntimeError(f"Island {i} exited with code "
+                               f"{processes[i].exitcode}")
+    for process in processes:
+        process.join()
+
+    population = [Shape.fromArray(array)
+                  for arrays, _ in results for array in arrays]
+    population.sort(key=lambda x: x.area, reverse=True)
+
+    halloffame = []
+    for gen in sorted(set().union(*[hof for _, hof in results])):
+        best = max((Shape.fromArray(hof[gen]) for _, hof in results
+                    if gen in hof), key=lambda x: x.area)
+        if recorder is not None:
+            recorder.append(gen, best)
+        else:
+            halloffame.append(best)
+
+    return population, halloffame
@@ -74,7 +74,7 @@ def arcsIntersect(center1, radius1, angles1, orientation1,
     center1 = center1.copy()
     center2 = center2.copy()
     angles1 = angles1.copy()
-    angles2 = angles1.copy()
+    angles2 = angles2.copy()
 
     # First, shift so that the first arc is centered on 0,0
     center2 -= center1
@@ -197,3 +197,265 @@ def linesIntersect(line1, line2):
         return False
 
     return (np.dot(vector1121, normalLine1) * np.dot(vector1122, normalLine1) < 0 and np.dot(vector2111, normalLine2) * np.dot(vector2112, normalLine2) < 0)
+
+
+def isPointInSectorBatch(xs, ys, angleBegin, angleEnd, orientation,
+                         includeBoundry=False):
+    """
+    Broadcasting version of isPointInSector.
+    xs and ys are the coordinates of the points, all arguments are
+    broadcast against each other and a boolean array is returned.
+    A zero length arc never contains a point (isPointInSector raises).
+    """
+
+    angleBegin = np.asarray(angleBegin, dtype=float) % (2 * np.pi)
+    angleEnd = np.asarray(angleEnd, dtype=float) % (2 * np.pi)
+    theta = np.arctan2(ys, xs) % (2 * np.pi)
+
+    # If orientation is negative, switch beginning and end, making it positive
+    negative = np.asarray(orientation) == -1
+    angleBegin, angleEnd = (np.where(negative, angleEnd, angleBegin),
+                            np.where(negative, angleBegin, angleEnd))
+
+    if includeBoundry:
+        # 0 isn't included
+        inside = (angleBegin <= theta) & (theta <= angleEnd)
+        # 0 is included
+        insideWrapped = (theta <= angleEnd) | (angleBegin <= theta)
+    else:
+        inside = (angleBegin < theta) & (theta < angleEnd)
+        insideWrapped = (theta < angleEnd) | (angleBegin < theta)
+
+    return np.where(angleBegin < angleEnd, inside,
+                    insideWrapped & (angleBegin != angleEnd))
+
+
+def linesIntersectBatch(lines1, lines2):
+    """
+    Broadcasting version of linesIntersect.
+    lines1 and lines2 are arrays of shape (..., 2, 2) that are broadcast
+    against each other, so lines[:, None] and lines[None, :] gives the
+    matrix of every pair.
+    Returns a boolean array of the broadcast shape.
+
+    Does NOT include endpoints
+    """
+
+    lines1 = np.asarray(lines1, dtype=float)
+    lines2 = np.asarray(lines2, dtype=float)
+
+    vector1121 = lines1[..., 0, :] - lines2[..., 0, :]
+    vector1122 = lines1[..., 0, :] - lines2[..., 1, :]
+    vector2111 = -vector1121
+    vector2112 = lines2[..., 0, :] - lines1[..., 1, :]
+    vectorLine1 = lines1[..., 1, :] - lines1[..., 0, :]
+    vectorLine2 = lines2[..., 1, :] - lines2[..., 0, :]
+
+    # Scalar products with the normals [vy, -vx] of the lines
+    def dotNormal(vector, vectorLine):
+        return (vector[..., 0] * vectorLine[..., 1] +
+                vector[..., 1] * -vectorLine[..., 0])
+
+    nonZero = (np.any(vectorLine1 != 0, axis=-1) &
+               np.any(vectorLine2 != 0, axis=-1))
+
+    return (nonZero &
+            (dotNormal(vector1121, vectorLine1) *
+             dotNormal(vector1122, vectorLine1) < 0) &
+            (dotNormal(vector2111, vectorLine2) *
+             dotNormal(vector2112, vectorLine2) < 0))
+
+
+def segmentIntersectsArcBatch(lines, centers, radii, angles, orientations):
+    """
+    Broadcasting version of segmentIntersectsArc.
+    lines: (..., 2, 2), centers: (..., 2), radii: (...),
+    angles: (..., 2) and orientations: (...)
+    Returns a boolean array of the broadcast shape.
+    """
+
+    lines = np.asarray(lines, dtype=float)
+    centers = np.asarray(centers, dtype=float)
+    radii = np.asarray(radii, dtype=float)
+    angles = np.asarray(angles, dtype=float)
+
+    # Translate so that arc center is at 0, 0
+    lines = lines - centers[..., None, :]
+
+    # Rotate so that line is horizontal
+    theta = np.arctan2(lines[..., 1, 1] - lines[..., 0, 1],
+                       lines[..., 1, 0] - lines[..., 0, 0]) % (2 * np.pi)
+    s = np.sin(-theta)[..., None]
+    c = np.cos(-theta)[..., None]
+    lineXs = c * lines[..., 0] - s * lines[..., 1]
+    lineY = (s * lines[..., 0] + c * lines[..., 1])[..., 0]
+    angleBegin = (angles[..., 0] - theta) % (2 * np.pi)
+    angleEnd = (angles[..., 1] - theta) % (2 * np.pi)
+
+    # If the line does not intersect the circle, it definitely doesn't
+    # intersect the arc
+    crossesCircle = np.abs(lineY) < radii
+
+    # The line intersects the circle at x values positive and negative xIntersection.
+    with np.errstate(invalid='ignore'):
+        xIntersection = np.sqrt(radii**2 - np.abs(lineY)**2)
+
+    # Don't include line endpoints
+    minX = np.min(lineXs, axis=-1)
+    maxX = np.max(lineXs, axis=-1)
+    # Both candidates, x and -x, along a last axis
+    xs = xIntersection[..., None] * np.array([1, -1])
+    # Include arc endpoints
+    inArc = isPointInSectorBatch(xs, lineY[..., None], angleBegin[..., None],
+                                 angleEnd[..., None],
+                                 np.asarray(orientations)[..., None],
+                                 includeBoundry=True)
+    return np.any(crossesCircle[..., None] & (minX[..., None] < xs) &
+                  (maxX[..., None] > xs) & inArc, axis=-1)
+
+
+def arcsIntersectBatch(centers1, radii1, angles1, orientations1,
+                       centers2, radii2, angles2, orientations2):
+    """
+    Broadcasting version of arcsIntersect, arguments are shaped as
+    for segmentIntersectsArcBatch.
+    Returns a boolean array of the broadcast shape.
+    """
+
+    centers1 = np.asarray(centers1, dtype=float)
+    centers2 = np.asarray(centers2, dtype=float)
+    radii1 = np.asarray(radii1, dtype=float)
+    radii2 = np.asarray(radii2, dtype=float)
+    angles1 = np.asarray(angles1, dtype=float)
+    angles2 = np.asarray(angles2, dtype=float)
+
+    # First, shift so that the first arc is centered on 0,0
+    delta = centers2 - centers1
+
+    # Rotate so that second arc is centered on (x,0)
+    theta = np.arctan2(delta[..., 1], delta[..., 0])
+    distance = np.cos(-theta) * delta[..., 0] - np.sin(-theta) * delta[..., 1]
+    angles1 = (angles1 - theta[..., None]) % (2 * np.pi)
+    angles2 = (angles2 - theta[..., None]) % (2 * np.pi)
+
+    # If the circles are too far away from each other to intersect
+    tooFar = distance >= radii1 + radii2
+
+    # If the two centers overlap,
+    # just check if the endpoints of one isn't in the other
+    concentric = (delta[..., 0] == 0) & (delta[..., 1] == 0)
+    # Both endpoints of an arc along a last axis
+    orientations1 = np.asarray(orientations1)[..., None]
+    orientations2 = np.asarray(orientations2)[..., None]
+    endPointsInside = (
+        np.any(isPointInSectorBatch(
+            radii2[..., None] * np.cos(angles2), radii2[..., None] * np.sin(angles2),
+            angles1[..., :1], angles1[..., 1:], orientations1), axis=-1) |
+        np.any(isPointInSectorBatch(
+            radii1[..., None] * np.cos(angles1), radii1[..., None] * np.sin(angles1),
+            angles2[..., :1], angles2[..., 1:], orientations2), axis=-1))
+    endPointsInside &= radii1 == radii2
+
+    # Circles intesect at (x,y) and (x,-y)
+    # Circles inside each other give nan, which is in no sector
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x = (distance**2 + radii1**2 - radii2**2)/(2*distance)
+        y = np.sqrt(radii1**2 - x**2)
+
+    # Both intersections, y and -y, along a last axis
+    ys = y[..., None] * np.array([1, -1])
+    intersecting = np.any(
+        isPointInSectorBatch(x[..., None], ys, angles1[..., :1],
+                             angles1[..., 1:], orientations1) &
+        isPointInSectorBatch((x - distance)[..., None], ys, angles2[..., :1],
+                             angles2[..., 1:], orientations2), axis=-1)
+
+    return np.where(concentric, endPointsInside, ~tooFar & intersecting)
+
+
+def segmentBoxes(lines):
+    """
+    Returns the smallest boxes around the line segments (..., 2, 2)
+    as an array (..., 4) on the form [xmin, ymin, xmax, ymax]
+    """
+
+    lines = np.asarray(lines, dtype=float)
+    return np.concatenate([np.min(lines, axis=-2), np.max(lines, axis=-2)],
+                          axis=-1)
+
+
+def arcBoxes(centers, radii, angles, orientations):
+    """
+    Returns the smallest boxes around the arcs as an array (..., 4)
+    on the form [xmin, ymin, xmax, ymax]
+    The box contains the endpoints of the arc and every point where
+    the arc reaches furthest along an axis.
+    """
+
+    centers = np.asarray(centers, dtype=float)
+    radii = np.asarray(radii, dtype=float)[..., None]
+    angles = np.asarray(angles, dtype=float)
+
+    # Endpoints
+    xs = centers[..., 0, None] + radii * np.cos(angles)
+    ys = centers[..., 1, None] + radii * np.sin(angles)
+    xmin, xmax = np.min(xs, axis=-1), np.max(xs, axis=-1)
+    ymin, ymax = np.min(ys, axis=-1), np.max(ys, axis=-1)
+
+    # Extreme points in the directions +x, +y, -x, -y,
+    # if they are on the arc
+    onArc = isPointInSectorBatch(np.array([1, 0, -1, 0]), np.array([0, 1, 0, -1]),
+                                 angles[..., :1], angles[..., 1:],
+                                 np.asarray(orientations)[..., None],
+                                 includeBoundry=True)
+    radii = radii[..., 0]
+    xmax = np.where(onArc[..., 0], centers[..., 0] + radii, xmax)
+    ymax = np.where(onArc[..., 1], centers[..., 1] + radii, ymax)
+    xmin = np.where(onArc[..., 2], centers[..., 0] - radii, xmin)
+    ymin = np.where(onArc[..., 3], centers[..., 1] - radii, ymin)
+
+    return np.stack([xmin, ymin, xmax, ymax], axis=-1)
+
+
+def boxesOverlap(boxes1, boxes2, tolerance=1e-9):
+    """
+    Broadcasting test of whether boxes [xmin, ymin, xmax, ymax] overlap,
+    touching (within tolerance) counts as overlapping
+    """
+
+    return ((boxes1[..., 0] <= boxes2[..., 2] + tolerance) &
+            (boxes2[..., 0] <= boxes1[..., 2] + tolerance) &
+            (boxes1[..., 1] <= boxes2[..., 3] + tolerance) &
+            (boxes2[..., 1] <= boxes1[..., 3] + tolerance))
+
+
+def sweepAndPrune(boxes, tolerance=1e-9):
+    """
+    Broad phase: returns every pair (i, j), i < j, of boxes (n, 4)
+    on the form [xmin, ymin, xmax, ymax] that overlap,
+    as two index arrays like np.triu_indices.
+
+    The boxes are sorted by xmin, then every box is paired with the
+    boxes after it that start before it ends, and those pairs are
+    pruned by their y extent.
+    """
+
+    boxes = np.asarray(boxes, dtype=float)
+    order = np.argsort(boxes[:, 0], kind='stable')
+    sortedBoxes = boxes[order]
+
+    # Box k (in sorted order) overlaps in x with boxes k+1, ..., ends[k]-1
+    starts = np.arange(1, len(boxes) + 1)
+    ends = np.searchsorted(sortedBoxes[:, 0], sortedBoxes[:, 2] + tolerance,
+                           side='right')
+    counts = np.maximum(ends - starts, 0)
+
+    first = np.repeat(np.arange(len(boxes)), counts)
+    # For each pair, its position among the pairs of the same first box
+    offsets = np.arange(np.sum(counts)) - np.repeat(np.cumsum(counts) - counts,
+                                                    counts)
+    second = np.repeat(starts, counts) + offsets
+
+    keep = boxesOverlap(sortedBoxes[first], sortedBoxes[second], tolerance)
+    first, second = order[first[keep]], order[second[keep]]
+    return (np.minimum(first, second), np.maximum(first, second))
@@ -0,0 +1,129 @@
+import numpy as np
+
+
+def sampleOutline(shape, spacing):
+    """
+    Returns points, an array (P, 2), at most spacing apart along what
+    isInBounds checks of shape: the circles of the inside nodes, the
+    arcs of the outside nodes and the binding lines
+    """
+
+    centers, radii, angles, orientations = shape.arcArrays()
+    samples = []
+
+    for center, radius, arc, orientation in zip(centers, radii, angles,
+                                                orientations):
+        if orientation == shape.o:
+            # Inside nodes are whole disks
+            begin, sweep = 0, 2 * np.pi
+        else:
+            begin = arc[0]
+            sweep = orientation * ((orientation * (arc[1] - arc[0])) %
+                                   (2 * np.pi))
+        count = int(np.ceil(abs(sweep) * radius / spacing)) + 1
+        thetas = begin + np.linspace(0, sweep, count)
+        samples.append(center + radius * np.stack([np.cos(thetas),
+                                                   np.sin(thetas)], axis=1))
+
+    for start, end in np.array(shape.lines):
+        count = int(np.ceil(np.linalg.norm(end - start) / spacing)) + 1
+        samples.append(start + np.linspace(0, 1, count)[:, None] *
+                       (end - start))
+
+    return np.concatenate(samples)
+
+
+class Occupancy:
+    """
+    The outline of shape rasterized once, in the frame of the shape,
+    into occupancy bitmasks, so most poses can be told to be in or out
+    of bounds with a few vectorized operations instead of the geometry
+    of every node and binding line.
+
+    The shape is in bounds if its outline is, since no part of the
+    region outside the corridor fits inside the shape, so only the
+    cells the outline goes through are kept. Every point of the outline
+    is within the tolerance of the level of the center of one of them,
+    so a pose where every center is more than that inside the corridor
+    is in bounds, and one where some center is more than that outside
+    is out of bounds.
+
+    The bitmasks are a pyramid, each level with cells twice as wide
+    as the one below, from a few cells up top down to the finest one
+    with cells resolution wide that has at most cellsPerNode cells per
+    node, finer than that costs more than isInBounds.
+    Poses are classified from the coarsest level down, each level only
+    looking at the poses the ones above couldn't tell, so poses far from
+    the walls only cost a few cells. Poses even the finest level can't
+    tell are close to the walls, where only isInBounds can.
+
+    That only pays off for large shapes, with many nodes for isInBounds
+    to go through. For the GA's shapes of a few nodes, and for walks,
+    whose poses always touch the walls, the geometry alone is faster.
+    configSpaceSearch uses it from occupancyNodes nodes up.
+    """
+
+    def __init__(self, shape, resolution=0.002, coarsest=16,
+                 cellsPerNode=32):
+        # Outline points are at most resolution / 2 apart, so every point
+        # in between is within resolution / 4 of one of them
+        samples = sampleOutline(shape, resolution / 2)
+        gap = resolution / 4
+        origin = np.min(samples, axis=0)
+        finest = cellsPerNode * len(shape.nodes)
+
+        # Coarsest first, the bitmasks and (centers, tolerance) of the cells
+        self.masks = []
+        self.levels = []
+        while True:
+            cells = np.floor((samples - origin) / resolution).astype(int)
+            mask = np.zeros(np.max(cells, axis=0) + 1, dtype=bool)
+            mask[cells[:, 0], cells[:, 1]] = True
+            centers = origin + (np.argwhere(mask) + 0.5) * resolution
+            if len(centers) <= finest:
+                tolerance = resolution * np.sqrt(2) / 2 + gap
+                self.masks.insert(0, mask)
+                self.levels.insert(0, (centers, tolerance))
+            if len(centers) <= coarsest:
+                break
+            resolution *= 2
+
+    def classify(self, poss, rots):
+        """
+        Returns, for every pose, 1 if the shape is surely in bounds,
+        -1 if it is surely out of bounds and 0 if it is too close to
+        tell, as an array (K,) of int8, when poss is an array (K, 2)
+        of positions and rots an array (K,) of rotations
+        """
+
+        rots = np.reshape(rots, -1)
+        poss = np.reshape(poss, (-1, 2))
+        verdicts = np.zeros(len(rots), dtype=np.int8)
+        unsure = np.arange(len(rots))
+
+        for centers, tolerance in self.levels:
+            c = np.cos(rots[unsure])[:, None]
+            s = np.sin(rots[unsure])[:, None]
+            xs = c * centers[:, 0] - s * centers[:, 1] + poss[unsure, :1]
+            ys = s * centers[:, 0] + c * centers[:, 1] + poss[unsure, 1:]
+
+            # The left and top walls only need the extreme cells
+            lefts = np.min(xs, axis=1)
+            tops = np.max(ys, axis=1)
+            # The inner corner, out if any cell is past it and in if
+            # every cell is further than tolerance from it
+            pastCorner = (xs > 0.5 + tolerance) & (ys < -0.5 - tolerance)
+            cornerXs = np.maximum(0.5 - xs, 0)
+            cornerYs = np.maximum(ys + 0.5, 0)
+            clearOfCorner = cornerXs**2 + cornerYs**2 > tolerance**2
+
+            inBounds = (lefts > -0.5 + tolerance) & \
+                (tops < 0.5 - tolerance) & np.all(clearOfCorner, axis=1)
+            outOfBounds = (lefts < -0.5 - tolerance) | \
+                (tops > 0.5 + tolerance) | np.any(pastCorner, axis=1)
+            verdicts[unsure[inBounds]] = 1
+            verdicts[unsure[outOfBounds]] = -1
+            unsure = unsure[~inBounds & ~outOfBounds]
+            if len(unsure) == 0:
+                break
+        return verdicts
@@ -1,9 +1,13 @@
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import matplotlib.animation as animation
+from matplotlib.collections import LineCollection
+from matplotlib.collections import PatchCollection
+from matplotlib.transforms import Affine2D
 import numpy as np
 from LineMath import rotMat
 from ShapeValidTest import isInBounds
+from ShapeValidTest import isInBoundsBatch
 
 
 def makeArtist(node, pos=np.array([0, 0]), rot=0):
@@ -13,7 +17,7 @@ def makeArtist(node, pos=np.array([0, 0]), rot=0):
     circle = plt.Circle(nodePos, node.r, fill=False)
     arrowbase = nodePos + node.r * np.array([0.5 * node.o, 0.5])
     arrowdelta = node.r * np.array([-node.o, 0])
-    arrow = plt.Arrow(*arrowbase, *arrowdelta, node.r/2, color="r")
+    arrow = plt.Arrow(*arrowbase, *arrowdelta, width=node.r/2, color="r")
 
     return [circle, arrow]
 
@@ -50,20 +54,53 @@ def binding_line(node1, node2):
     return np.array([linePoint1, linePoint2])
 
 
-def plotShape(shape, ax, pos=np.array([0, 0]), rot=0):
-    "Plots shape on axis"
+class ShapeArtist:
+    """
+    Draws shape on ax with one collection for the circles, one for the
+    arrows showing the orientations and one for the binding lines.
+    They are drawn in the shape's own coordinates, moving the shape only
+    changes the transform they share, so a walk can be animated without
+    rebuilding anything.
+    If animated is True, the collections are left out of normal draws,
+    for blitting.
+    """
+
+    def __init__(self, shape, ax, pos=np.array([0, 0]), rot=0,
+                 animated=False):
+        self.pose = Affine2D()
+        transform = self.pose + ax.transData
+
+        circles = []
+        arrows = []
+        for node in shape.nodes:
+            circles.append(plt.Circle(node.pos, node.r))
+            arrowbase = node.pos + node.r * np.array([0.5 * node.o, 0.5])
+            arrowdelta = node.r * np.array([-node.o, 0])
+            arrows.append(plt.Arrow(*arrowbase, *arrowdelta, width=node.r/2))
+
+        self.circles = PatchCollection(circles, facecolor='none',
+                                       edgecolor='k', transform=transform,
+                                       animated=animated)
+        self.arrows = PatchCollection(arrows, color='r', transform=transform,
+                                      animated=animated)
+        self.lines = LineCollection(np.array(shape.lines), transform=transform,
+                                    animated=animated)
+        self.artists = [self.circles, self.arrows, self.lines]
+        for artist in self.artists:
+            ax.add_collection(artist, autolim=False)
+
+        self.setPose(pos, rot)
+
+    def setPose(self, pos, rot):
+        "Moves the shape to position pos and rotation rot"
+
+        self.pose.clear().rotate(rot).translate(*pos)
+
 
-    # Plot all of the nodes:
-    for node in shape.nodes:
-        nodeArtist = makeArtist(node, pos, rot)
-        for artist in nodeArtist:
-            ax.add_artist(artist)
+def plotShape(shape, ax, pos=np.array([0, 0]), rot=0):
+    "Plots shape on axis, returns its ShapeArtist"
 
-    # Plot the lines
-    lines = np.array([[np.matmul(rotMat(rot), point) +
-                       pos for point in line] for line in shape.lines])
-    for line in lines:
-        ax.plot(line[:, 0], line[:, 1])
+    return ShapeArtist(shape, ax, pos, rot)
 
 
 def tmpShowShape(shape, pos=np.array([0, 0]), rot=0):
@@ -87,19 +124,28 @@ def animateWalk(shape, poss, rots):
     # Create figure and axis
     fig, ax = plt.subplots()
 
+    # Check if the shape is in bounds in every frame at once
+    inBounds = isInBoundsBatch(shape, np.array(poss, dtype=float), rots)
+
+    # The corridor stays put, only the shape and the text move
+    ax.set_ylim(-2, 2)
+    ax.set_xlim(-2, 2)
+    ax.plot([0.5, 0.5, 2], [-2, -0.5, -0.5], 'k')
+    ax.plot([-0.5, -0.5, 2], [-2, 0.5, 0.5], 'k')
+    artist = ShapeArtist(shape, ax, poss[0], rots[0], animated=True)
+    # The title is outside of the axes, which blitting doesn't redraw
+    text = ax.text(0.02, 0.98, "", transform=ax.transAxes, va='top',
+                   animated=True)
+
     def animate(i):
-        ax.clear()
-        plotShape(shape, ax, poss[i], rots[i])
-        ax.set_ylim(-2, 2)
-        ax.set_xlim(-2, 2)
-        ax.plot([0.5, 0.5, 2], [-2, -0.5, -0.5], 'k')
-        ax.plot([-0.5, -0.5, 2], [-2, 0.5, 0.5], 'k')
-        ax.set_title(f"i: {i}, inBounds: {isInBounds(shape, poss[i], rots[i])}")
-
-    anim = FuncAnimation(fig, animate, init_func=None, frames=len(
-        poss), interval=10, blit=False, repeat=True, repeat_delay=0)
-    # Set up formatting for the movie files
-    Writer = animation.writers['imagemagick']
-    writer = Writer(fps=15, bitrate=1800)
+        artist.setPose(poss[i], rots[i])
+        text.set_text(f"i: {i}, inBounds: {inBounds[i]}")
+        return artist.artists + [text]
+
+    anim = FuncAnimation(fig, animate, init_func=lambda: animate(0),
+                         frames=len(poss), interval=10, blit=True,
+                         repeat=True, repeat_delay=0)
+    # Pillow writes the GIF in this process, no external program needed
+    writer = animation.PillowWriter(fps=15)
 
     anim.save('walk.gif', writer=writer)
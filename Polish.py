@@ -0,0 +1,61 @@
+import numpy as np
+
+from Shape import Shape
+
+
+def polish(shape, evaluator, iterations=50, step=0.05, shrink=0.5, tries=8,
+           minRadius=0.01):
+    """
+    Returns shape, which should be valid, with its area climbed along
+    Shape.areaGradient while keeping it simple and valid.
+
+    Every iteration is a backtracking line search: steps along the
+    gradient, scaled so the parameter changing the most changes by the
+    step, are tried from the longest down, shrinking by shrink,
+    tries of them. The first that is simple, has radii of at least
+    minRadius and a larger area is checked with evaluator.areValid,
+    and the first valid one is taken. The next iteration starts from
+    twice the step taken. Stops when no step is taken.
+    """
+
+    array = shape.toArray()
+    for _ in range(iterations):
+        gradient = shape.areaGradient()
+        largest = np.max(np.abs(gradient))
+        if largest == 0:
+            break
+        direction = np.zeros_like(array)
+        direction[:, :3] = gradient / largest
+
+        for length in step * shrink ** np.arange(tries):
+            candidateArray = array + length * direction
+            if np.min(candidateArray[:, 2]) < minRadius:
+                continue
+            candidate = Shape.fromArray(candidateArray)
+            if candidate.area <= shape.area or not candidate.isSimple():
+                continue
+            if evaluator.areValid([candidate])[0]:
+                break
+        else:
+            # Not even the shortest step worked
+            break
+
+        shape = candidate
+        array = candidateArray
+        step = 2 * length
+
+    return shape
+
+
+def polishPopulation(population, count, evaluator, **kwargs):
+    """
+    Returns population with its count largest shapes polished,
+    sorted by area
+    """
+
+    population = sorted(population, key=lambda x: x.area, reverse=True)
+    polished = [polish(shape, evaluator, **kwargs)
+                for shape in population[:count]]
+    population = polished + population[count:]
+    population.sort(key=lambda x: x.area, reverse=True)
+    return population
@@ -1,5 +1,6 @@
 import numpy as np
 import LineMath
+from LineMath import linesIntersectBatch
 
 
 
@@ -22,13 +23,7 @@ class Polygon:
         self.ys = self.ys + vector[1]
 
     def calculateArea(self):
-        n = len(self.xs)
-        area = 0.0
-        for i in range(n):
-            j = (i + 1) % n
-            area += self.xs[i] * self.ys[j]
-            area -= self.xs[j] * self.ys[i]
-        self.area = abs(area) / 2.0
+        self.area = polygonAreas(self.xs, self.ys)
 
     # Simple random choice = 16.7 s for 100 000 offsprings
     def createOffspring(self):
@@ -98,3 +93,76 @@ class Polygon:
 
         return Polygon(newXs, newYs)
 
+    def createOffspringBatch(self, count):
+        """
+        Returns count offspring at once, mutated the same way as
+        createOffspring does, as arrays xs and ys of shape (count, n),
+        shifted such that the first point is at 0,0 as in Polygon.
+        The mutations of all offspring are drawn at once, and each
+        moved point is checked against every edge of every offspring
+        in one go. The points are still moved one at a time,
+        since each move is checked against the edges moved before it.
+        Only the offspring are batched, validity is still checked one
+        polygon at a time with PolygonValidTest.moveSequence, whose
+        search takes a different path for every polygon.
+        """
+
+        mutationProbabillity = 0.1
+        mutationLength = 0.05
+        n = len(self.xs)
+
+        mutate = np.random.random((count, n)) <= mutationProbabillity
+        deltas = (np.random.random((count, n, 2)) - 0.5) * 2 * mutationLength
+
+        points = np.empty((count, n, 2))
+        points[..., 0] = self.xs
+        points[..., 1] = self.ys
+
+        # Edge k goes from point k - 1 to point k, as in createOffspring
+        others = np.arange(n)
+        for pointIndex in range(n):
+            rows = np.flatnonzero(mutate[:, pointIndex])
+            if len(rows) == 0:
+                continue
+
+            previous = (pointIndex - 1) % n
+            following = (pointIndex + 1) % n
+            newPoints = points[rows, pointIndex] + deltas[rows, pointIndex]
+            lineToMovedPoint = np.stack([points[rows, previous], newPoints],
+                                        axis=1)
+            lineFromMovedPoint = np.stack([points[rows, following], newPoints],
+                                          axis=1)
+            edges = np.stack([np.roll(points[rows], 1, axis=1), points[rows]],
+                             axis=2)
+
+            # Edges with the moved point as endpoint are ignored, and the
+            # edges bordering the lines to and from it are only checked
+            # against the other one of them
+            ignored = (others == pointIndex) | ((others - 1) % n == pointIndex)
+            bordersTo = others == previous
+            bordersFrom = ((others - 1) % n == following) & ~bordersTo
+            checkTo = ~ignored & ~bordersTo
+            checkFrom = ~ignored & ~bordersFrom
+
+            crossed = (checkTo & linesIntersectBatch(
+                lineToMovedPoint[:, None], edges)) | (checkFrom &
+                linesIntersectBatch(lineFromMovedPoint[:, None], edges))
+            moved = rows[~np.any(crossed, axis=1)]
+            points[moved, pointIndex] = newPoints[~np.any(crossed, axis=1)]
+
+        xs = points[..., 0] - points[:, :1, 0]
+        ys = points[..., 1] - points[:, :1, 1]
+        return xs, ys
+
+
+def polygonAreas(xs, ys):
+    """
+    Returns the areas of the polygons with points xs and ys,
+    arrays (..., n), for any number of polygons at once
+    """
+
+    xs = np.asarray(xs, dtype=float)
+    ys = np.asarray(ys, dtype=float)
+    area = np.sum(xs * np.roll(ys, -1, axis=-1) -
+                  np.roll(xs, -1, axis=-1) * ys, axis=-1)
+    return np.abs(area) / 2.0
@@ -1,5 +1,4 @@
 import numpy as np
-from copy import deepcopy
 
 
 def isThrough(p):
@@ -8,55 +7,100 @@ def isThrough(p):
 
 dTheta = 0.2
 
-def scooch(p, next_point):
-    # Move p small amount so that the next point is at corner
-    # Returns true if operation has been done and
-    # false if it cannot be done
 
-    # Translate shape
-    moveBy = np.array([0-p.xs[next_point], 0-p.ys[next_point]])
-    p.translate(moveBy)
+def isOutOfBounds(points):
+    """
+    Returns True if any of points, an array (2, n) of xs and ys,
+    is outside of the corridor
+    """
 
-    # Check if there are any points out of bounds,
-    # If not, we're good to go
-    if not (any(np.logical_and(p.xs > 0, p.ys < 0)) or any(p.ys > 1)):
-        return True
+    xs, ys = points
+    return bool(np.any((xs > 0) & (ys < 0)) or np.any(ys > 1) or
+                np.any(xs < -1))
 
-    # Translate back, return false
-    p.translate(-moveBy)
-    return False
 
+def canScooch(points):
+    """
+    Returns True if points, moved such that the next point is at the
+    corner, are in bounds. The left wall isn't checked, as in the
+    original recursive search
+    """
 
-def moveSequence(p, seq=[], depth=0):
-    # Returns a sequence of pxs and pys that navigates p through the corridor if posible, otherwise returns None
-    # p - polygon, seq - sequence so far as [(p1.xs, p1.ys),(p2.xs ...
+    xs, ys = points
+    return not (np.any((xs > 0) & (ys < 0)) or np.any(ys > 1))
 
-    if isThrough(p):
-        return seq
 
-    if (any(np.logical_and(tmP.xs > 0, tmP.ys < 0)) or any(tmP.ys > 1) or any(tmP.xs < -1)):
-        return None
-    # Try to scootch
-    tmP = deepcopy(p)
-    scooched = scooch(tmP, depth)
-
-    # If scooched, go deeper
-    if scooched:
-        newSeq = list(seq) + [(tmP.xs, tmP.ys)]
-        while True:
-            rv = moveSequence(tmP, newSeq, depth+1)
-            # If rv isn't none, moveSequence returned a valid sequence
-            if rv != None:
-                return rv
-            # Otherwise, there is no valid sequence. 
-            # Rotate and try again
-            tmP.rotate((0, 0), -dTheta)
-            newSeq = newSeq + [(tmP.xs, tmP.ys)]
-            # If there are points out of bounds after rot, there is no 
-            # valid sequence
-            if (any(np.logical_and(tmP.xs > 0, tmP.ys < 0)) or any(tmP.ys > 1) or any(tmP.xs < -1)):
-                return None
-            # Else, run again
-    else:  # If not scooched, there is no valid sequence, return none
+def moveSequence(p, dTheta=dTheta):
+    """
+    Returns a sequence of (xs, ys) that navigates p through the
+    corridor if posible, otherwise returns None
+
+    Point by point, the polygon is moved such that the next point is
+    at the corner, and if it can't get through from there, it is
+    rotated cw by dTheta around the corner and tried again.
+    Moving point d to the corner after rotating k times always gives
+    the same pose, the points minus point d rotated by -k dTheta, so
+    the search is over states (d, k). It is a depth first search with
+    an explicit stack, and states that failed once are remembered and
+    not searched again. Poses are calculated into preallocated
+    buffers as they are needed.
+    """
+
+    base = np.array([p.xs, p.ys], dtype=float)
+    n = base.shape[1]
+    # A full turn without getting anywhere won't get anywhere
+    maxRotations = int(np.ceil(2*np.pi / dTheta))
+
+    centered = np.empty_like(base)
+    pose = np.empty_like(base)
+    rotMatrix = np.empty((2, 2))
+
+    def poseAt(d, k):
+        "Sets pose to the points with point d at the corner, rotated k times"
+
+        np.subtract(base, base[:, d:d+1], out=centered)
+        c, s = np.cos(-k * dTheta), np.sin(-k * dTheta)
+        rotMatrix[:] = [[c, -s], [s, c]]
+        np.matmul(rotMatrix, centered, out=pose)
+        return pose
+
+    if np.all(base[1] >= 0):
+        return []
+    if isOutOfBounds(base) or not canScooch(poseAt(0, 0)):
         return None
 
+    failed = set()
+    # Frames [d, k, k when entered], the deepest last
+    stack = [[0, 0, 0]]
+    descend = True
+    while stack:
+        frame = stack[-1]
+        d, k, _ = frame
+
+        if descend:
+            poseAt(d, k)
+            if np.all(pose[1] >= 0):
+                # The poses of every frame, from when it was entered
+                return [tuple(poseAt(fd, j).copy())
+                        for fd, fk, k0 in stack for j in range(k0, fk + 1)]
+
+            # Try with the next point at the corner
+            if d + 1 < n and (d + 1, k) not in failed and \
+                    not isOutOfBounds(pose) and canScooch(poseAt(d + 1, k)):
+                stack.append([d + 1, k, k])
+                continue
+
+        # That didn't work, rotate and try again, unless that
+        # gets out of bounds
+        if k + 1 - frame[2] > maxRotations or \
+                isOutOfBounds(poseAt(d, k + 1)):
+            # Every rotation of this frame led here
+            failed.update((d, j) for j in range(frame[2], k + 1))
+            stack.pop()
+            descend = False
+            continue
+
+        frame[1] = k + 1
+        descend = True
+
+    return None
@@ -0,0 +1,198 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image
+
+from HallOfFame import HallOfFame
+from PlotShape import ShapeArtist
+from Shape import Shape
+from ShapeValidTest import isInBoundsBatch
+
+
+def newAxes(figsize=(6.4, 4.8), dpi=100):
+    "Returns a figure and axes drawn with Agg, no display needed"
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig, fig.add_subplot()
+
+
+def toImage(fig):
+    "Draws fig and returns it as an (h, w, 3) uint8 array"
+
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+def walkFrames(array, poss, rots, labels):
+    """
+    Returns the frames of the shape with node array array
+    at positions poss and rotations rots in the corridor
+    """
+
+    fig, ax = newAxes()
+    ax.set_ylim(-2, 2)
+    ax.set_xlim(-2, 2)
+    ax.plot([0.5, 0.5, 2], [-2, -0.5, -0.5], 'k')
+    ax.plot([-0.5, -0.5, 2], [-2, 0.5, 0.5], 'k')
+    artist = ShapeArtist(Shape.fromArray(array), ax)
+
+    frames = []
+    for pos, rot, label in zip(poss, rots, labels):
+        artist.setPose(pos, rot)
+        ax.set_title(label)
+        frames.append(toImage(fig))
+    return frames
+
+
+def hallOfFameFrames(source, indices, labels):
+    """
+    Returns the frames of the shapes at indices of source, a hall of fame
+    file or a list of node arrays
+    """
+
+    if isinstance(source, str):
+        source = HallOfFame(source)
+        shapes = [source[i] for i in indices]
+    else:
+        shapes = [Shape.fromArray(source[i]) for i in indices]
+
+    fig, ax = newAxes()
+    ax.set_xlim(-1, 3)
+    ax.set_ylim(1, -3)
+
+    frames = []
+    for shape, label in zip(shapes, labels):
+        artist = ShapeArtist(shape, ax)
+        ax.set_title(label)
+        frames.append(toImage(fig))
+        for collection in artist.artists:
+            collection.remove()
+    return frames
+
+
+def renderChunks(function, count, arguments, workers):
+    """
+    Returns the frames function returns for the frames 0 to count,
+    split into chunks rendered by workers processes, or in this process
+    if there are less than two. arguments(indices) returns the arguments
+    of function for the frames at indices.
+    Starting the workers costs more than a short animation takes to
+    render, so callers render in this process by default.
+    """
+
+    if workers < 2:
+        return function(*arguments(np.arange(count)))
+
+    # A few chunks per worker, so none of them waits for the others long
+    chunks = np.array_split(np.arange(count), min(count, 4 * workers))
+    frames = []
+    with ProcessPoolExecutor(workers) as pool:
+        for chunk in pool.map(function, *zip(*map(arguments, chunks))):
+            frames.extend(chunk)
+    return frames
+
+
+def renderWalk(shape, poss, rots, workers=0):
+    "Returns the frames of an animation of shape walking poss and rots"
+
+    poss = np.array(poss, dtype=float)
+    rots = np.array(rots, dtype=float)
+    inBounds = isInBoundsBatch(shape, poss, rots)
+    labels = [f"i: {i}, inBounds: {inBounds[i]}" for i in range(len(rots))]
+    array = shape.toArray()
+
+    return renderChunks(
+        walkFrames, len(rots),
+        lambda indices: (array, poss[indices], rots[indices],
+                         [labels[i] for i in indices]),
+        workers)
+
+
+def renderHallOfFame(halloffame, workers=0):
+    """
+    Returns the frames of an animation of the shapes in halloffame,
+    a HallOfFame or a list of shapes
+    """
+
+    if isinstance(halloffame, HallOfFame):
+        # The workers read the shapes from the file themselves
+        source = halloffame.filename
+        labels = [f"Generation {gen}" for gen in halloffame.generations]
+    else:
+        source = [shape.toArray() for shape in halloffame]
+        labels = [f"Generation {i*2 + 1}" for i in range(len(halloffame))]
+
+    return renderChunks(
+        hallOfFameFrames, len(labels),
+        lambda indices: (source, indices, [labels[i] for i in indices]),
+        workers)
+
+
+def saveGif(frames, filename, fps=5):
+    """
+    Saves frames, (h, w, 3) uint8 arrays, as a looping GIF
+    Raises ValueError if there are no frames
+    """
+
+    images = [Image.fromarray(frame) for frame in frames]
+    if not images:
+        raise ValueError(f"No frames to save to {filename}")
+    images[0].save(filename, save_all=True, append_images=images[1:],
+                   duration=int(1000 / fps), loop=0)
+
+
+def saveFrames(frames, directory):
+    """
+    Saves frames as directory/frame00000.png and on, which ffmpeg
+    turns into an MP4 with
+    ffmpeg -i directory/frame%05d.png -pix_fmt yuv420p out.mp4
+    """
+
+    os.makedirs(directory, exist_ok=True)
+    for i, frame in enumerate(frames):
+        Image.fromarray(frame).save(os.path.join(directory,
+                                                 f"frame{i:05d}.png"))
+
+
+def save(frames, out, fps):
+    "Saves frames as a GIF if out ends with .gif, else as PNGs in out"
+
+    if out.endswith('.gif'):
+        saveGif(frames, out, fps)
+    else:
+        saveFrames(frames, out)
+
+
+if __name__ == "__main__":
+    import argparse
+    from ShapeValidTest import getWalk
+
+    parser = argparse.ArgumentParser(
+        description="Render a recorded hall of fame, or the walk of one "
+        "of its shapes, without a display")
+    parser.add_argument('what', choices=['hof', 'walk'])
+    parser.add_argument('filename', help="the hall of fame file")
+    parser.add_argument('--out', default=None,
+                        help="GIF to save, or directory for PNG frames, "
+                        "hof.gif or walk.gif by default")
+    parser.add_argument('--index', type=int, default=-1,
+                        help="the shape to walk, the last by default")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="processes to render with, only worth it for "
+                        "many frames on several cores, 0 renders in this "
+                        "process")
+    args = parser.parse_args()
+
+    halloffame = HallOfFame(args.filename)
+    if args.what == 'hof':
+        save(renderHallOfFame(halloffame, args.workers),
+             args.out or 'hof.gif', fps=5)
+    else:
+        shape = halloffame[args.index]
+        poss, rots = getWalk(shape)
+        save(renderWalk(shape, poss, rots, args.workers),
+             args.out or 'walk.gif', fps=15)
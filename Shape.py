@@ -1,13 +1,19 @@
 import numpy as np
-from copy import deepcopy
-import itertools
 
-from LineMath import linesIntersect
-from LineMath import segmentIntersectsArc
-from LineMath import arcsIntersect
+from LineMath import linesIntersectBatch
+from LineMath import segmentIntersectsArcBatch
+from LineMath import arcsIntersectBatch
+from LineMath import segmentBoxes
+from LineMath import arcBoxes
+from LineMath import boxesOverlap
+from LineMath import sweepAndPrune
+from Telemetry import telemetry
 
 
 class Node:
+    # Nodes are many and small, so they don't get a __dict__
+    __slots__ = ('pos', 'r', 'o', 'ID')
+
     def __init__(self, pos, radius, orientation, ID):
         # X and Y position on center
         self.pos = np.array(pos)
@@ -17,6 +23,12 @@ class Node:
         self.o = orientation
         self.ID = ID
 
+    def clone(self):
+        "Returns a copy of the node"
+
+        # __init__ copies pos
+        return Node(self.pos, self.r, self.o, self.ID)
+
 
 class Shape:
     """
@@ -43,10 +55,44 @@ class Shape:
     self.area: the area of the shape
     """
 
+    __slots__ = ('nodes', 'nodeAngles', 'lines', 'o', 'area',
+                 'angleChanges', 'polygonTerms', 'sectorTerms')
+
     def __init__(self, nodes):
         self.nodes = nodes
         self.recalculate()
 
+    @classmethod
+    def fromArray(cls, array):
+        "Creates a shape from an (n, 4) array with rows [x, y, r, o]"
+
+        return cls([Node(row[:2], float(row[2]), int(row[3]), ID)
+                    for ID, row in enumerate(array)])
+
+    def toArray(self):
+        "Returns the nodes as an (n, 4) array with rows [x, y, r, o]"
+
+        return np.array([[node.pos[0], node.pos[1], node.r, node.o]
+                         for node in self.nodes], dtype=float)
+
+    def clone(self):
+        """
+        Returns a copy of the shape. Everything is copied as it is,
+        nothing needs to be recalculated.
+        """
+
+        shape = Shape.__new__(Shape)
+        shape.nodes = [node.clone() for node in self.nodes]
+        shape.nodeAngles = {ID: angles.copy()
+                            for ID, angles in self.nodeAngles.items()}
+        shape.lines = [line.copy() for line in self.lines]
+        shape.o = self.o
+        shape.area = self.area
+        shape.angleChanges = self.angleChanges.copy()
+        shape.polygonTerms = self.polygonTerms.copy()
+        shape.sectorTerms = self.sectorTerms.copy()
+        return shape
+
     def recalculate(self):
         """"
         Recalculates nodeAngles, binding lines, orientation, area and nodeIDs
@@ -62,6 +108,7 @@ class Shape:
 
         self.findNodeAngles()
         self.calculateBindingLines()
+        self.calculateTerms()
         self.calculateOrientation()
         self.calculateArea()
 
@@ -86,20 +133,22 @@ class Shape:
         radStd = 0.02
 
         # Create newShape
-        newNodes = deepcopy(self.nodes)
-        newShape = Shape(newNodes)
+        newShape = self.clone()
 
-        for node in newShape.nodes:
+        # Changing a single node only touches the geometry next to it,
+        # so those mutations update and check the shape incrementally.
+        # This relies on self being simple to begin with.
+        for nodeIndex, node in enumerate(newShape.nodes):
             # With probabillity mutatePosProb, mutate position
             if np.random.random_sample() < mutatePosProb:
                 deltaPos = np.random.normal(0, posStd, 2)
                 node.pos += deltaPos
                 # Check that this mutation didn't make it not simple
-                newShape.recalculate()
-                if not newShape.isSimple():
+                newShape.updateNode(nodeIndex)
+                if not newShape.mutationIsSimple(changedNode=nodeIndex):
                     # If it did, undo it
                     node.pos -= deltaPos
-                    newShape.recalculate()
+                    newShape.updateNode(nodeIndex)
 
             # With probabillity mutateRadProb, mutate radius
             if np.random.random_sample() < mutateRadProb:
@@ -107,11 +156,11 @@ class Shape:
                 # The radius cannot be 0 or negative
                 node.r += deltaRad
                 # Check that this mutation didn't make it not simple
-                newShape.recalculate()
-                if not newShape.isSimple():
+                newShape.updateNode(nodeIndex)
+                if not newShape.mutationIsSimple(changedNode=nodeIndex):
                     # If it did, undo it
                     node.r -= deltaRad
-                    newShape.recalculate()
+                    newShape.updateNode(nodeIndex)
         if bigMutations:
             # with probabillity mutateNoProb, add a node between two nodes
             if np.random.random_sample() < mutateNoProb:
@@ -126,7 +175,7 @@ class Shape:
 
                 # Check that shape is still valid
                 newShape.recalculate()
-                if not newShape.isSimple():
+                if not newShape.mutationIsSimple():
                     del newShape.nodes[nodeID]
                     newShape.recalculate()
 
@@ -138,7 +187,7 @@ class Shape:
                 del newShape.nodes[nodeID]
                 # Check that shape is still valid
                 newShape.recalculate()
-                if not newShape.isSimple():
+                if not newShape.mutationIsSimple():
                     newShape.nodes.insert(nodeID, removedNode)
                     newShape.recalculate()
 
@@ -147,53 +196,173 @@ class Shape:
                 nodeID = np.random.choice(len(newShape.nodes))
                 newShape.nodes[nodeID].o *= -1
                 # Check that shape is still valid
-                newShape.recalculate()
-                if not newShape.isSimple():
+                newShape.updateNode(nodeID)
+                if not newShape.mutationIsSimple(changedNode=nodeID):
                     newShape.nodes[nodeID].o *= -1
-                    newShape.recalculate()
+                    newShape.updateNode(nodeID)
 
         return newShape
 
-    def isSimple(self):
-        "Checks that the shape is simple, if so, return True, else False"
+    def mutationIsSimple(self, changedNode=None):
+        """
+        Returns isSimple(changedNode) for a shape that was just mutated,
+        counting the mutation, and whether it was rejected, in telemetry
+        """
+
+        telemetry.count('mutations')
+        with telemetry.timer('simplicity'):
+            simple = self.isSimple(changedNode)
+        if not simple:
+            telemetry.count('rejectedMutations')
+        return simple
+
+    def isSimple(self, changedNode=None):
+        """
+        Checks that the shape is simple, if so, return True, else False
+
+        If changedNode (a node index) is given, the rest of the shape is
+        assumed to be simple, and only the binding lines to and from
+        that node and the arcs of it and its neighbours are checked.
+        """
+
+        N = len(self.nodes)
+        lines = np.array(self.lines)
+        centers, radii, angles, orientations = self.arcArrays()
+        allNodes = np.arange(N)
+
+        # Broad phase: only primitives whose boxes overlap can intersect.
+        # Primitive k < N is binding line k, k >= N is the arc of node k - N
+        boxes = np.concatenate([segmentBoxes(lines),
+                                arcBoxes(centers, radii, angles, orientations)])
+
+        if changedNode is None:
+            # Every pair (i, j) with i < j, as with itertools.combinations
+            first, second = sweepAndPrune(boxes)
+            linePairs = (first[second < N], second[second < N])
+            arcPairs = (first[first >= N] - N, second[first >= N] - N)
+            # Lines come before arcs, so mixed pairs are (line, arc)
+            mixed = (first < N) & (second >= N)
+            lineArcPairs = (first[mixed], second[mixed] - N)
+            consecutive = allNodes
+        else:
+            # The lines i-1 -> i and i -> i+1 and the arcs of i-1, i and i+1
+            changedLines = np.array([(changedNode - 1) % N, changedNode])
+            changedArcs = np.array([(changedNode - 1) % N, changedNode,
+                                    (changedNode + 1) % N])
+            linePairs = self.overlapping(boxes, self.pairsWith(changedLines, N))
+            arcPairs = self.overlapping(boxes[N:], self.pairsWith(changedArcs, N))
+            lineArcPairs = np.concatenate(
+                [self.allPairs(changedLines, allNodes),
+                 self.allPairs(allNodes, changedArcs)], axis=1)
+            lineArcPairs = self.overlapping(boxes, lineArcPairs, offset=N)
+            consecutive = np.array([changedNode, (changedNode + 1) % N])
 
         # Check that no two binding lines cross
-        for linePair in itertools.combinations(self.lines, 2):
-            if linesIntersect(linePair[0], linePair[1]):
-                return False
+        if np.any(linesIntersectBatch(lines[linePairs[0]],
+                                      lines[linePairs[1]])):
+            return False
 
         # Check that no arc intersects a binding line
-        for node in self.nodes:
-            for line in self.lines:
-                if segmentIntersectsArc(line, node.pos, node.r,
-                                        self.nodeAngles[node.ID], node.o):
-                    return False
+        arcs = lineArcPairs[1]
+        if np.any(segmentIntersectsArcBatch(lines[lineArcPairs[0]],
+                                            centers[arcs], radii[arcs],
+                                            angles[arcs], orientations[arcs])):
+            return False
 
         # Check that no two arcs intersect each other
-        for nodePair in itertools.combinations(self.nodes, 2):
-            if arcsIntersect(nodePair[0].pos, nodePair[0].r,
-                             self.nodeAngles[nodePair[0].ID], nodePair[0].o,
-                             nodePair[1].pos, nodePair[1].r,
-                             self.nodeAngles[nodePair[1].ID], nodePair[1].o):
-                return False
+        first, second = arcPairs
+        if np.any(arcsIntersectBatch(centers[first], radii[first],
+                                     angles[first], orientations[first],
+                                     centers[second], radii[second],
+                                     angles[second], orientations[second])):
+            return False
 
         # No consecutive nodes can be inside each other
         # No consecutive nodes of opposite orientation 
         # can intersect
-        for nodeIndex in range(len(self.nodes)):
-            node1 = self.nodes[nodeIndex]
-            node2 = self.nodes[nodeIndex-1]
-            dist = np.linalg.norm(node1.pos - node2.pos)
-            if dist + node1.r < node2.r:
-                return False
-            if dist + node2.r < node1.r:
-                return False
-            if node1.o != node2.o:
-                # They cannot intersect
-                if dist < node1.r + node2.r:
-                    return False
+        # node1 is node i and node2 is node i - 1
+        node1 = consecutive
+        node2 = (consecutive - 1) % N
+        dists = np.linalg.norm(centers[node1] - centers[node2], axis=1)
+        if np.any(dists + radii[node1] < radii[node2]):
+            return False
+        if np.any(dists + radii[node2] < radii[node1]):
+            return False
+        # Nodes of opposite orientation cannot intersect
+        opposite = orientations[node1] != orientations[node2]
+        if np.any(opposite & (dists < radii[node1] + radii[node2])):
+            return False
         return True
 
+    @staticmethod
+    def overlapping(boxes, pairs, offset=0):
+        """
+        Returns the pairs (i, j) for which boxes[i] and boxes[j + offset]
+        overlap, pairs is given and returned as two index arrays
+        """
+
+        first, second = pairs
+        keep = boxesOverlap(boxes[first], boxes[second + offset])
+        return (first[keep], second[keep])
+
+    @staticmethod
+    def allPairs(indices1, indices2):
+        "Returns every pair (i, j) of indices1 x indices2 as a (2, n) array"
+
+        return np.array([np.repeat(indices1, len(indices2)),
+                         np.tile(indices2, len(indices1))])
+
+    @staticmethod
+    def pairsWith(indices, N):
+        """
+        Returns the pairs (min(i, j), max(i, j)), i != j, of 0..N-1 where
+        i is in indices, as two index arrays like np.triu_indices.
+        Pairs of two indices in indices appear twice.
+        """
+
+        indices = np.asarray(indices)[:, None]
+        others = np.arange(N)
+        first = np.minimum(indices, others).ravel()
+        second = np.maximum(indices, others).ravel()
+        different = first != second
+        return (first[different], second[different])
+
+    def arcArrays(self):
+        """
+        Returns the arcs of the nodes as arrays
+        (centers, radii, angles, orientations), ordered as self.nodes
+        """
+
+        centers = np.array([node.pos for node in self.nodes], dtype=float)
+        radii = np.array([node.r for node in self.nodes], dtype=float)
+        angles = np.array([self.nodeAngles[node.ID] for node in self.nodes],
+                          dtype=float)
+        orientations = np.array([node.o for node in self.nodes])
+        return (centers, radii, angles, orientations)
+
+    def updateNode(self, nodeIndex):
+        """
+        Updates nodeAngles, binding lines, orientation and area after
+        the node at nodeIndex has been moved, resized or flipped.
+        Only the two binding lines touching the node and the terms of
+        the node and its neighbours are recalculated.
+        """
+
+        N = len(self.nodes)
+
+        # The lines i-1 -> i and i -> i+1 touch the node
+        for lineIndex in [(nodeIndex - 1) % N, nodeIndex]:
+            self.findLineAngles(lineIndex)
+        for lineIndex in [(nodeIndex - 1) % N, nodeIndex]:
+            self.calculateBindingLine(lineIndex)
+
+        # The angles of the node and both neighbours have changed
+        for index in [(nodeIndex - 1) % N, nodeIndex, (nodeIndex + 1) % N]:
+            self.calculateNodeTerms(index)
+
+        self.calculateOrientation()
+        self.calculateArea()
+
     def findNodeAngles(self):
         """
         Sets self.nodeAngles such that self.nodeAngles[ID] is a tuple
@@ -201,71 +370,84 @@ class Shape:
         (incomming, outgoing) line touches the node
         """
 
-        N = len(self.nodes)
-
         # Initialize nodeAngles as an empty dictionary
         self.nodeAngles = {}
 
-        for nodeIndex in range(N):
-            node1 = self.nodes[nodeIndex]
-            node2 = self.nodes[(nodeIndex+1) % N]
-
-            # Vector from center of 1 to center of 2
-            vector12 = node2.pos - node1.pos
-            dist12 = np.linalg.norm(vector12)
-
-            # Angle vector makes with pos x axis, \in [-pi, pi]
-            theta = np.arctan2(vector12[1], vector12[0])
-
-            # Calculate angles (from vector12) where the line touches
-            # If orientations are the same:
-            if node1.o * node2.o == 1:
-                alpha = np.arccos((node1.r - node2.r)/dist12)
-                beta = alpha
-            # If orientations are different:
-            elif node1.o * node2.o == -1:
-                alpha = np.arccos((node1.r + node2.r)/dist12)
-                beta = alpha-np.pi
-
-            # If node1s orientation is 1, flip the signs of the angles
-            alpha *= -node1.o
-            beta *= -node1.o
-
-            # Add theta to the angles
-            alpha += theta
-            beta += theta
-
-            # Make angles be between 0 and 2 pi
-            alpha = alpha % (2*np.pi)
-            beta = beta % (2*np.pi)
-
-            # Update nodeAngles
-            if node1.ID in self.nodeAngles:
-                self.nodeAngles[node1.ID][1] = alpha
-            else:
-                self.nodeAngles[node1.ID] = np.array([None, alpha])
-
-            if node2.ID in self.nodeAngles:
-                self.nodeAngles[node2.ID][0] = beta
-            else:
-                self.nodeAngles[node2.ID] = np.array([beta, None])
+        for nodeIndex in range(len(self.nodes)):
+            self.findLineAngles(nodeIndex)
+
+    def findLineAngles(self, nodeIndex):
+        """
+        Sets the outgoing angle of node nodeIndex and the incomming
+        angle of the node after it
+        """
+
+        N = len(self.nodes)
+        node1 = self.nodes[nodeIndex]
+        node2 = self.nodes[(nodeIndex+1) % N]
+
+        # Vector from center of 1 to center of 2
+        vector12 = node2.pos - node1.pos
+        dist12 = np.linalg.norm(vector12)
+
+        # Angle vector makes with pos x axis, \in [-pi, pi]
+        theta = np.arctan2(vector12[1], vector12[0])
+
+        # Calculate angles (from vector12) where the line touches
+        # If orientations are the same:
+        if node1.o * node2.o == 1:
+            alpha = np.arccos((node1.r - node2.r)/dist12)
+            beta = alpha
+        # If orientations are different:
+        elif node1.o * node2.o == -1:
+            alpha = np.arccos((node1.r + node2.r)/dist12)
+            beta = alpha-np.pi
+
+        # If node1s orientation is 1, flip the signs of the angles
+        alpha *= -node1.o
+        beta *= -node1.o
+
+        # Add theta to the angles
+        alpha += theta
+        beta += theta
+
+        # Make angles be between 0 and 2 pi
+        alpha = alpha % (2*np.pi)
+        beta = beta % (2*np.pi)
+
+        # Update nodeAngles
+        if node1.ID in self.nodeAngles:
+            self.nodeAngles[node1.ID][1] = alpha
+        else:
+            self.nodeAngles[node1.ID] = np.array([None, alpha])
+
+        if node2.ID in self.nodeAngles:
+            self.nodeAngles[node2.ID][0] = beta
+        else:
+            self.nodeAngles[node2.ID] = np.array([beta, None])
 
     def calculateBindingLines(self):
-        self.lines = []
         N = len(self.nodes)
+        self.lines = [None] * N
         for nodeIndex in range(N):
-            node1 = self.nodes[nodeIndex]
-            node2 = self.nodes[(nodeIndex+1) % N]
+            self.calculateBindingLine(nodeIndex)
 
-            alpha = self.nodeAngles[node1.ID][1]
-            beta = self.nodeAngles[node2.ID][0]
+    def calculateBindingLine(self, nodeIndex):
+        "Sets self.lines[nodeIndex], the line from node nodeIndex to the next"
 
-            linePoint1 = node1.pos + node1.r * \
-                np.array([np.cos(alpha), np.sin(alpha)])
-            linePoint2 = node2.pos + node2.r * \
-                np.array([np.cos(beta), np.sin(beta)])
+        N = len(self.nodes)
+        node1 = self.nodes[nodeIndex]
+        node2 = self.nodes[(nodeIndex+1) % N]
+
+        alpha = self.nodeAngles[node1.ID][1]
+        beta = self.nodeAngles[node2.ID][0]
+
+        linePoint1 = node1.pos + node1.r * \
+            np.array([np.cos(alpha), np.sin(alpha)])
+        linePoint2 = node2.pos + node2.r * \
+            np.array([np.cos(beta), np.sin(beta)])
 
-            self.lines.append(np.array([linePoint1, linePoint2]))
+        self.lines[nodeIndex] = np.array([linePoint1, linePoint2])
 
     def calculateOrientation(self):
         """
@@ -275,21 +457,10 @@ class Shape:
         If the shape is positively oriented, ALL nodes with positive
         orientation are inside the shape and ALL nodes with negative
         orientation are outside.
+        The angle changes of the nodes are set by calculateTerms.
         """
 
-        cumulativeAngleChange = 0
-        for node in self.nodes:
-            # Calculate the angle change due to node
-            angleIn, angleOut = self.nodeAngles[node.ID]
-            # Angle change is out - in if positively oriented,
-            # and in - out if negatively oriented
-            angleChange = (node.o*(angleOut - angleIn)) % (2 * np.pi)
-            if node.o == 1:
-                cumulativeAngleChange += angleChange
-            elif node.o == -1:
-                cumulativeAngleChange -= angleChange
-
-        self.o = 1 if cumulativeAngleChange > 0 else -1
+        self.o = 1 if np.sum(self.angleChanges) > 0 else -1
 
     def calculateArea(self):
         """
@@ -298,42 +469,85 @@ class Shape:
         the binding lines and the centers of the nodes
         Then, add the circle sectors from the circles inside the shape
         and subtract the circle sectors on the outside.
-        """
 
-        # Create all of the points for the first shape
-        # Also sum up the circle sector areas
-        points = []
-        circleSectorAreas = 0
-        for node in self.nodes:
-            pos = node.pos
-            angleIn, angleOut = self.nodeAngles[node.ID]
-            deltap1 = node.r * np.array([np.cos(angleIn), np.sin(angleIn)])
-            deltap2 = node.r * np.array([np.cos(angleOut), np.sin(angleOut)])
-
-            points.append(pos + deltap1)
-            points.append(pos)
-            points.append(pos + deltap2)
-
-            # Calculate and add the circle sector area
-            # The angle change is out - in if positively oriented
-            # but in - out if negatively oriented.
-            deltaAngle = (node.o * (angleOut - angleIn)) % (2*np.pi)
-            # Circle sector should be added if inside and subtracted if
-            # outside
-            circleSectorAreas += self.o * node.o * node.r**2 * deltaAngle / 2
-
-        # Shift points so that first point is at 0,0
-        points = points - points[0]
+        The terms of the nodes are set by calculateTerms.
+        """
 
         # Calculate the area
-        area = 0.0
-        n = len(points)
-        for i in range(n):
-            j = (i + 1) % n
-            area += points[i][0] * points[j][1]
-            area -= points[j][0] * points[i][1]
-        area = abs(area) / 2.0
-
-        # Add the circleSectorAreas
+        area = abs(np.sum(self.polygonTerms)) / 2.0
+
+        # Circle sector should be added if inside and subtracted if
+        # outside
+        circleSectorAreas = self.o * np.sum(self.sectorTerms)
+
         self.area = area + circleSectorAreas
 
+    def calculateTerms(self):
+        "Calculates the orientation and area terms of every node"
+
+        N = len(self.nodes)
+        self.angleChanges = np.zeros(N)
+        self.polygonTerms = np.zeros(N)
+        self.sectorTerms = np.zeros(N)
+        for nodeIndex in range(N):
+            self.calculateNodeTerms(nodeIndex)
+
+    def calculateNodeTerms(self, nodeIndex):
+        """
+        Sets the terms that node nodeIndex contributes to the
+        orientation and the area of the shape:
+
+        self.angleChanges[nodeIndex]: the signed angle change at the node
+        self.polygonTerms[nodeIndex]: twice the signed area swept by
+        (incomming point, center, outgoing point, next incomming point)
+        self.sectorTerms[nodeIndex]: signed area of the circle sector,
+        positive for positively oriented nodes
+        """
+
+        node = self.nodes[nodeIndex]
+        nextNode = self.nodes[(nodeIndex+1) % len(self.nodes)]
+        pos = node.pos
+        angleIn, angleOut = self.nodeAngles[node.ID]
+        nextAngleIn = self.nodeAngles[nextNode.ID][0]
+
+        # Angle change is out - in if positively oriented,
+        # and in - out if negatively oriented
+        deltaAngle = (node.o * (angleOut - angleIn)) % (2*np.pi)
+        self.angleChanges[nodeIndex] = node.o * deltaAngle
+
+        # The points of the first shape
+        pointIn = pos + node.r * np.array([np.cos(angleIn), np.sin(angleIn)])
+        pointOut = pos + node.r * np.array([np.cos(angleOut), np.sin(angleOut)])
+        nextPointIn = nextNode.pos + nextNode.r * \
+            np.array([np.cos(nextAngleIn), np.sin(nextAngleIn)])
+
+        polygonTerm = 0.0
+        for p1, p2 in [(pointIn, pos), (pos, pointOut), (pointOut, nextPointIn)]:
+            polygonTerm += p1[0] * p2[1] - p2[0] * p1[1]
+        self.polygonTerms[nodeIndex] = polygonTerm
+
+        self.sectorTerms[nodeIndex] = node.o * node.r**2 * deltaAngle / 2
+
+    def areaGradient(self, h=1e-6):
+        """
+        Returns the gradient of the area with respect to the node
+        parameters, as an (n, 3) array with rows
+        [d/dx, d/dy, d/dr], by central differences of step h,
+        all evaluated at once as a ShapeBatch
+        """
+
+        # ShapeBatch imports this module
+        from ShapeBatch import ShapeBatch
+
+        array = self.toArray()
+        n = len(array)
+
+        # Row k of the first half has parameter k nudged up by h,
+        # the second half nudged down
+        steps = np.zeros((3 * n, n, 4))
+        steps[np.arange(3 * n), np.repeat(np.arange(n), 3),
+              np.tile(np.arange(3), n)] = h
+        areas = ShapeBatch.fromArrays(
+            np.concatenate([array + steps, array - steps])).area
+        return ((areas[:3*n] - areas[3*n:]) / (2*h)).reshape(n, 3)
+
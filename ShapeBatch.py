@@ -0,0 +1,237 @@
+import numpy as np
+
+from LineMath import linesIntersectBatch
+from LineMath import segmentIntersectsArcBatch
+from LineMath import arcsIntersectBatch
+from Shape import Shape
+
+
+class ShapeBatch:
+    """
+    A whole population of shapes stored as padded arrays.
+    Shape i has counts[i] nodes, stored in the first counts[i]
+    entries along the node axis, the rest is padding.
+    The class always contains the following properties
+
+    self.pos: node positions, np.array of shape (S, N, 2)
+    self.r: node radii, shape (S, N)
+    self.nodeO: node orientations (+1 or -1, 0 for padding), shape (S, N)
+    self.mask: True for real nodes, False for padding, shape (S, N)
+    self.counts: number of nodes of each shape, shape (S,)
+
+    After recalculate, the same properties as Shape, for all shapes at once:
+
+    self.nodeAngles: [angleIn, angleOut] of every node, shape (S, N, 2)
+    self.lines: binding line from node i to node i+1, shape (S, N, 2, 2)
+    self.o: orientation of every shape, shape (S,)
+    self.area: area of every shape, shape (S,)
+
+    The GA itself keeps Shape objects, which the walks need, and
+    getOffspring updates their geometry node by node as it mutates,
+    so it has no whole population left to recalculate. A ShapeBatch is
+    for many shapes evaluated at once, as in Shape.areaGradient.
+    """
+
+    def __init__(self, pos, r, nodeO, counts):
+        self.pos = np.asarray(pos, dtype=float)
+        self.r = np.asarray(r, dtype=float)
+        self.nodeO = np.asarray(nodeO)
+        self.counts = np.asarray(counts)
+
+        S, N = self.r.shape
+        nodeIndices = np.arange(N)
+        self.mask = nodeIndices < self.counts[:, None]
+
+        # Index of the next node around each shape,
+        # padding points to itself so that it never touches a real node
+        self.nextIndex = np.where(self.mask,
+                                  (nodeIndices + 1) % np.maximum(self.counts, 1)[:, None],
+                                  nodeIndices)
+        self.recalculate()
+
+    @classmethod
+    def fromShapes(cls, shapes):
+        "Creates a batch holding the nodes of every shape in shapes"
+
+        return cls.fromArrays([shape.toArray() for shape in shapes])
+
+    @classmethod
+    def fromArrays(cls, arrays):
+        "Creates a batch from a list of (n, 4) [x, y, r, o] node arrays"
+
+        counts = np.array([len(array) for array in arrays])
+        params = np.zeros((len(arrays), max(counts, default=0), 4))
+        for i, array in enumerate(arrays):
+            params[i, :len(array)] = array
+
+        return cls(params[..., :2], params[..., 2],
+                   params[..., 3].astype(int), counts)
+
+    def toArrays(self):
+        "Returns a list of (n, 4) [x, y, r, o] node arrays, one per shape"
+
+        params = np.concatenate([self.pos, self.r[..., None],
+                                 self.nodeO[..., None]], axis=-1)
+        return [params[i, :n] for i, n in enumerate(self.counts)]
+
+    def toShapes(self):
+        "Returns the batch as a list of Shape objects"
+
+        return [Shape.fromArray(array) for array in self.toArrays()]
+
+    def __len__(self):
+        return len(self.counts)
+
+    def recalculate(self):
+        "Recalculates nodeAngles, binding lines, orientations and areas"
+
+        self.findNodeAngles()
+        self.calculateBindingLines()
+        self.calculateOrientation()
+        self.calculateArea()
+
+    def nextNodes(self, array):
+        "Returns array (S, N, ...) reordered so that entry i is node i+1"
+
+        index = self.nextIndex.reshape(self.nextIndex.shape +
+                                       (1,) * (array.ndim - 2))
+        return np.take_along_axis(array, index, axis=1)
+
+    def findNodeAngles(self):
+        """
+        Sets self.nodeAngles, the angles from the x axis of the points
+        at which the incomming and outgoing lines touch the nodes,
+        see Shape.findNodeAngles
+        """
+
+        nextPos = self.nextNodes(self.pos)
+        nextR = self.nextNodes(self.r)
+        nextO = self.nextNodes(self.nodeO)
+
+        # Vector from center of 1 to center of 2
+        vector12 = nextPos - self.pos
+        dist12 = np.linalg.norm(vector12, axis=-1)
+
+        # Angle vector makes with pos x axis, \in [-pi, pi]
+        theta = np.arctan2(vector12[..., 1], vector12[..., 0])
+
+        # Calculate angles (from vector12) where the line touches
+        # Padding has zero distance to itself, ignore the warnings
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sameOrientation = self.nodeO * nextO == 1
+            alpha = np.where(sameOrientation,
+                             np.arccos((self.r - nextR)/dist12),
+                             np.arccos((self.r + nextR)/dist12))
+        beta = np.where(sameOrientation, alpha, alpha - np.pi)
+
+        # If node1s orientation is 1, flip the signs of the angles
+        alpha = (alpha * -self.nodeO + theta) % (2*np.pi)
+        beta = (beta * -self.nodeO + theta) % (2*np.pi)
+
+        # The outgoing angle of node i is alpha,
+        # the incomming angle of node i+1 is beta
+        self.nodeAngles = np.zeros(self.pos.shape)
+        self.nodeAngles[..., 1] = np.where(self.mask, alpha, 0)
+        np.put_along_axis(self.nodeAngles[..., 0], self.nextIndex,
+                          np.where(self.mask, beta, 0), axis=1)
+
+    def calculateBindingLines(self):
+        "Sets self.lines, line i goes from node i to node i+1"
+
+        angleOut = self.nodeAngles[..., 1]
+        nextAngleIn = self.nextNodes(self.nodeAngles[..., 0])
+
+        linePoint1 = self.pos + self.r[..., None] * \
+            np.stack([np.cos(angleOut), np.sin(angleOut)], axis=-1)
+        linePoint2 = self.nextNodes(self.pos) + self.nextNodes(self.r)[..., None] * \
+            np.stack([np.cos(nextAngleIn), np.sin(nextAngleIn)], axis=-1)
+
+        self.lines = np.stack([linePoint1, linePoint2], axis=-2)
+
+    def calculateOrientation(self):
+        "Sets self.o, see Shape.calculateOrientation"
+
+        angleIn = self.nodeAngles[..., 0]
+        angleOut = self.nodeAngles[..., 1]
+        angleChange = (self.nodeO * (angleOut - angleIn)) % (2 * np.pi)
+        # Padding has orientation 0 and does not contribute
+        cumulativeAngleChange = np.sum(self.nodeO * angleChange, axis=1)
+
+        self.o = np.where(cumulativeAngleChange > 0, 1, -1)
+
+    def calculateArea(self):
+        "Sets self.area, see Shape.calculateArea"
+
+        angleIn = self.nodeAngles[..., 0]
+        angleOut = self.nodeAngles[..., 1]
+        r = self.r[..., None]
+
+        # The points of the first shape, three per node, shifted so that
+        # the first point is at 0,0
+        pointIn = self.pos + r * np.stack([np.cos(angleIn), np.sin(angleIn)],
+                                          axis=-1)
+        pointOut = self.pos + r * np.stack([np.cos(angleOut), np.sin(angleOut)],
+                                           axis=-1)
+        origin = pointIn[:, :1]
+        pointIn = pointIn - origin
+        center = self.pos - origin
+        pointOut = pointOut - origin
+
+        def cross(p1, p2):
+            return p1[..., 0] * p2[..., 1] - p2[..., 0] * p1[..., 1]
+
+        # in -> center -> out -> in of the next node
+        crossTerms = (cross(pointIn, center) + cross(center, pointOut) +
+                      cross(pointOut, self.nextNodes(pointIn)))
+        area = np.abs(np.sum(np.where(self.mask, crossTerms, 0), axis=1)) / 2.0
+
+        # Circle sectors are added if inside and subtracted if outside
+        deltaAngle = (self.nodeO * (angleOut - angleIn)) % (2*np.pi)
+        circleSectorAreas = np.sum(self.nodeO * self.r**2 * deltaAngle / 2,
+                                   axis=1)
+
+        self.area = area + self.o * circleSectorAreas
+
+    def isSimple(self):
+        "Returns an (S,) boolean array, True where the shape is simple"
+
+        # Every pair (i, j) with i < j of real nodes
+        N = self.r.shape[1]
+        pairs = (np.triu(np.ones((N, N), dtype=bool), k=1) &
+                 self.mask[:, :, None] & self.mask[:, None, :])
+        lineArcPairs = self.mask[:, :, None] & self.mask[:, None, :]
+
+        lines = self.lines
+        centers = self.pos[:, None]
+        radii = self.r[:, None]
+        angles = self.nodeAngles[:, None]
+        orientations = self.nodeO[:, None]
+
+        # Check that no two binding lines cross
+        crossing = np.any(linesIntersectBatch(lines[:, :, None], lines[:, None, :])
+                          & pairs, axis=(1, 2))
+
+        # Check that no arc intersects a binding line
+        crossing |= np.any(segmentIntersectsArcBatch(lines[:, :, None], centers,
+                                                     radii, angles, orientations)
+                           & lineArcPairs, axis=(1, 2))
+
+        # Check that no two arcs intersect each other
+        crossing |= np.any(arcsIntersectBatch(self.pos[:, :, None],
+                                              self.r[:, :, None],
+                                              self.nodeAngles[:, :, None],
+                                              self.nodeO[:, :, None],
+                                              centers, radii, angles,
+                                              orientations)
+                           & pairs, axis=(1, 2))
+
+        # No consecutive nodes can be inside each other
+        # No consecutive nodes of opposite orientation can intersect
+        nextR = self.nextNodes(self.r)
+        dists = np.linalg.norm(self.nextNodes(self.pos) - self.pos, axis=-1)
+        consecutive = ((dists + self.r < nextR) | (dists + nextR < self.r) |
+                       ((self.nodeO != self.nextNodes(self.nodeO)) &
+                        (dists < self.r + nextR)))
+        crossing |= np.any(consecutive & self.mask, axis=1)
+
+        return ~crossing
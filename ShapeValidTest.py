@@ -1,6 +1,10 @@
 from Shape import Shape
 from LineMath import linesIntersect
 from LineMath import segmentIntersectsArc
+from LineMath import isPointInSectorBatch
+from LineMath import linesIntersectBatch
+from LineMath import segmentIntersectsArcBatch
+from Telemetry import telemetry
 import numpy as np
 
 
@@ -12,6 +16,20 @@ def rotMat(theta):
                      [s, c]])
 
 
+def rotatePoints(points, rots):
+    """
+    Returns points (an array (..., 2)) rotated around (0,0) by
+    every angle in rots, as an array (len(rots), ..., 2)
+    """
+
+    rots = np.reshape(rots, (-1,) + (1,) * (np.ndim(points) - 1))
+    c = np.cos(rots)
+    s = np.sin(rots)
+    x = points[..., 0]
+    y = points[..., 1]
+    return np.stack([c * x - s * y, s * x + c * y], axis=-1)
+
+
 def isThrough(shape, pos, rot):
     """
     Returns True if the shape transposed by pos and rotated
@@ -29,19 +47,35 @@ def isThrough(shape, pos, rot):
     return True
 
 
-def isInBounds(shape, pos, rot):
-    "Returns True if no part of shape is outside of corridor"
+def isInBounds(shape, pos, rot, occupancy=None):
+    """
+    Returns True if no part of shape is outside of corridor
+    If occupancy, an Occupancy of shape, is given, the geometry is only
+    checked if it can't tell
+    """
+
+    if occupancy is not None:
+        verdict = occupancy.classify(pos, rot)[0]
+        if verdict != 0:
+            return bool(verdict > 0)
+
+    telemetry.count('isInBounds')
 
     # Facts used: There is no need to check if lines cross the outer border,
     # if they did, that necessarily means a node is outside the outer border
 
+    # Because of comparing floats, we need a tolerance for machine
+    # precision magnitude of errors, as in nodesOutOfBounds
+    tol = 1e-13
+
     for node in shape.nodes:
         # Calculate the position of the node
         nodePos = np.matmul(rotMat(rot), node.pos) + pos
         # If the node is inside the shape
         if node.o == shape.o:
             # If node is outside outer bounds
-            if nodePos[1] + node.r > 0.5 or nodePos[0] - node.r < -0.5:
+            if nodePos[1] + node.r > 0.5 + tol or \
+                    nodePos[0] - node.r < -0.5 - tol:
                 return False
             # If the inner corner (0.5,-0.5) is inside node
             cornerPos = np.array([0.5, -0.5])
@@ -121,6 +155,101 @@ def nodesOutOfBounds(shape, pos, rot):
     return rvList
 
 
+def nodePositions(shape, poss, rots):
+    """
+    Returns the positions of all nodes of shape for every pose,
+    as an array (K, len(shape.nodes), 2), when poss is an array (K, 2)
+    of positions and rots an array (K,) of rotations
+    """
+
+    centers = np.array([node.pos for node in shape.nodes], dtype=float)
+    return rotatePoints(centers, rots) + np.reshape(poss, (-1, 1, 2))
+
+
+def isInBoundsBatch(shape, poss, rots, occupancy=None):
+    """
+    Returns isInBounds for every pose, as a boolean array (K,),
+    when poss is an array (K, 2) of positions and rots an array (K,)
+    of rotations
+    If occupancy, an Occupancy of shape, is given, only the poses
+    it can't tell are checked with the geometry
+    """
+
+    if occupancy is not None:
+        poss = np.reshape(poss, (-1, 2))
+        rots = np.reshape(rots, -1)
+        verdicts = occupancy.classify(poss, rots)
+        inBounds = verdicts > 0
+        unsure = verdicts == 0
+        if np.any(unsure):
+            inBounds[unsure] = isInBoundsBatch(shape, poss[unsure],
+                                               rots[unsure])
+        return inBounds
+
+    rots = np.reshape(rots, -1)
+    telemetry.count('isInBounds', len(rots))
+    _, radii, angles, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+    nodePos = nodePositions(shape, poss, rots)
+    xs = nodePos[..., 0]
+    ys = nodePos[..., 1]
+
+    # Same tests as in isInBounds for the inside nodes, outer bounds,
+    # with the same tolerance, inner corner inside node, below the
+    # corner and outside inner line and past the corner and below inner line
+    tol = 1e-13
+    cornerDists = np.linalg.norm(nodePos - np.array([0.5, -0.5]), axis=-1)
+    out = (ys + radii > 0.5 + tol) | (xs - radii < -0.5 - tol) | \
+        (cornerDists < radii)
+    out |= (ys < -0.5) & (xs + radii > 0.5)
+    out |= (xs > 0.5) & (ys - radii < -0.5)
+    outOfBounds = np.any(out & inside, axis=1)
+
+    # Arcs of outside nodes intersecting the lower inner line
+    innerLine = np.array([[0.5, -0.5], [0.5, -100]])
+    outOfBounds |= np.any(segmentIntersectsArcBatch(
+        innerLine, nodePos[:, ~inside], radii[~inside],
+        angles[~inside] + rots[:, None, None], orientations[~inside]), axis=1)
+
+    # Binding lines crossing the inner line
+    innerLine = np.array([[0.5, -100], [0.5, -0.5]])
+    lines = rotatePoints(np.array(shape.lines), rots) + \
+        np.reshape(poss, (-1, 1, 1, 2))
+    outOfBounds |= np.any(linesIntersectBatch(lines, innerLine), axis=1)
+
+    return ~outOfBounds
+
+
+def nodesOutOfBoundsBatch(shape, poss, rots):
+    """
+    Returns which quadrants (see nodesOutOfBounds) the (inside) nodes
+    are out of bounds in, for every pose, as a boolean array
+    (K, len(shape.nodes), 4) where [k, ID, q - 1] is True if node ID
+    is out of bounds in quadrant q in pose k
+    """
+
+    _, radii, _, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+    nodePos = nodePositions(shape, poss, rots)
+    xs = nodePos[..., 0]
+    ys = nodePos[..., 1]
+
+    # Because of comparing floats, we need a tolerance for machine
+    # precision magnitude of errors
+    tol = 1e-13
+
+    cornerDists = np.linalg.norm(nodePos - np.array([0.5, -0.5]), axis=-1)
+    quadrant1 = ys + radii > 0.5 + tol
+    quadrant3 = xs - radii < -0.5 - tol
+    quadrant4 = ((xs + radii > 0.5 + tol) & (ys <= -0.5)) | \
+        ((ys - radii < -0.5 - tol) & (xs >= 0.5)) | \
+        (cornerDists < radii + tol)
+
+    quadrants = np.stack([quadrant1, quadrant1 & quadrant3,
+                          quadrant3, quadrant4], axis=-1)
+    return quadrants & inside[:, None]
+
+
 def posRotToShiftTwoNodes(nodePos1, nodePos2, delta1, delta2):
     """
     Takes two nodes' (original) positions and where to move them
@@ -156,15 +285,30 @@ def posRotToRotateAroundNode(shape, currentRot, theta, nodeID):
     return (deltaPos, deltaRot)
 
 
-def posRotToShiftRightWithRot(shape, pos, rot):
+def rotationFan(shape, pos, rot, stepRot, nodeID, count):
+    """
+    Returns the positions (count, 2) and rotations (count,) reached by
+    rotating count times by stepRot around node nodeID,
+    starting from pos and rot, one posRotToRotateAroundNode at a time
+    """
+
+    # Accumulated one step at a time, just as a loop would
+    rots = np.add.accumulate(np.concatenate([[rot], np.full(count, stepRot)]))
+    origNodePos = rotatePoints(shape.nodes[nodeID].pos, rots[:-1])
+    newNodePos = rotatePoints(origNodePos, [stepRot])[0]
+    poss = np.add.accumulate(np.vstack([pos, origNodePos - newNodePos]))
+    return (poss[1:], rots[1:])
+
+
+def posRotToShiftRightWithRot(shape, pos, rot, stepRight=0.01,
+                              stepRot=-0.01):
     """
     Returns the deltapos and deltarot required to shift shape
-    right by stepRight
+    right by stepRight, rotating by stepRot at a time to get back in bounds
     If it isn't possible, returns None.
     """
 
-    stepRight = 0.01
-    stepRot = -0.01
+    telemetry.count('walkSteps')
 
     # Move shape right
     newPos = pos + np.array([stepRight, 0])
@@ -175,7 +319,12 @@ def posRotToShiftRightWithRot(shape, pos, rot):
 
     # While shape is not in bounds, rotate cw until it is
     # or something new goes out of bounds
-    while not isInBounds(shape, newPos, newRot):
+    # Usually a step or two is enough, if not the rest is done
+    # with rotateInFans
+    for _ in range(2):
+        if isInBounds(shape, newPos, newRot):
+            return (newPos - pos, newRot - rot)
+
         deltaPos, deltaRot = posRotToRotateAroundNode(
             shape, newRot, stepRot, topNodeID)
 
@@ -197,14 +346,273 @@ def posRotToShiftRightWithRot(shape, pos, rot):
             newPos += deltaPos
             newRot += deltaRot
 
-    return (newPos - pos, newRot - rot)
+    if isInBounds(shape, newPos, newRot):
+        return (newPos - pos, newRot - rot)
 
+    posRot = rotateInFans(shape, newPos, newRot, stepRot, topNodeID)
+    if posRot is None:
+        return None
+    return (posRot[0] - pos, posRot[1] - rot)
 
-def shapeIsValid(shape):
+
+def rotateInFans(shape, pos, rot, stepRot, topNodeID, fanSize=8):
     """
-    Returns true if shape can be moved through a corridor with
-    width 1 and a 90 degree turn to the right
-    The corridor is initially centered on 0
+    Rotates the shape, which is out of bounds at pos and rot, by stepRot
+    around the top node until it is in bounds, the same way as
+    posRotToShiftRightWithRot, but probes a whole fan of rotations at
+    once. The fan doubles in size for as long as it is too short.
+    Returns the pos and rot where the shape is in bounds,
+    or None if it isn't possible.
+    """
+
+    while True:
+        possFan, rotsFan = rotationFan(shape, pos, rot, stepRot,
+                                       topNodeID, fanSize)
+        inBounds = isInBoundsBatch(shape, possFan, rotsFan)
+        quadrants = nodesOutOfBoundsBatch(shape, possFan, rotsFan)
+
+        # As in nodesOutOfBounds order, the first node out of bounds in
+        # quadrant I or III decides. If it went out in quadrant I,
+        # rotate around that one instead, if it is out in quadrant III,
+        # the game is lost
+        firstNodes = np.argmax(quadrants[..., 0] | quadrants[..., 2], axis=1)
+        firstQuadrants = quadrants[np.arange(fanSize), firstNodes]
+        newTop = firstQuadrants[:, 0]
+        lost = firstQuadrants[:, 2] & ~newTop
+
+        stops = inBounds | newTop | lost
+        if not stops.any():
+            pos = possFan[-1]
+            rot = rotsFan[-1]
+            fanSize = min(2 * fanSize, 256)
+            continue
+
+        i = np.argmax(stops)
+        if newTop[i]:
+            if i > 0:
+                pos = possFan[i - 1]
+                rot = rotsFan[i - 1]
+            topNodeID = firstNodes[i]
+        elif lost[i]:
+            return None
+        else:
+            return (possFan[i], rotsFan[i])
+
+
+def obstacleReach(shape, rots, posYs):
+    """
+    Returns, for every rotation in rots and the matching y-position in
+    posYs, how far to the right (relative to the x-position of the shape)
+    the part of the shape at or below the inner corner reaches.
+    The shape can be moved right until that point meets x = 0.5.
+    -inf if no part of the shape is that low.
+    """
+
+    centers, radii, angles, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+
+    rotated = rotatePoints(centers, rots)
+    xs = rotated[..., 0]
+    # How far above the corner the node centers are
+    heights = rotated[..., 1] + posYs[:, None] + 0.5
+    # Half of the chord the line y = -0.5 cuts out of the node circles
+    halfChords = np.sqrt(np.maximum(radii**2 - heights**2, 0))
+
+    # Inside nodes are whole disks, just as in isInBounds
+    reach = np.where(heights <= 0, xs + radii, xs + halfChords)
+    reach = np.max(np.where(inside & (heights < radii), reach, -np.inf),
+                   axis=1)
+
+    # Outside nodes only reach as far as their arcs cross y = -0.5,
+    # the rest of the arc lies inside the shape
+    fanIndex, nodeIndex = np.nonzero(~inside & (np.abs(heights) <= radii))
+    arcAngles = angles[nodeIndex] + np.reshape(rots, -1)[fanIndex, None]
+    for sign in [1, -1]:
+        halfChord = sign * halfChords[fanIndex, nodeIndex]
+        onArc = isPointInSectorBatch(halfChord, -heights[fanIndex, nodeIndex],
+                                     arcAngles[:, 0], arcAngles[:, 1],
+                                     orientations[nodeIndex],
+                                     includeBoundry=True)
+        np.maximum.at(reach, fanIndex[onArc],
+                      xs[fanIndex, nodeIndex][onArc] + halfChord[onArc])
+
+    # Binding lines reach with their low endpoints and where they
+    # cross y = -0.5
+    lines = rotatePoints(np.array(shape.lines), rots)
+    lineXs = lines[..., 0]
+    lineHeights = lines[..., 1] + posYs[:, None, None] + 0.5
+    for end in [0, 1]:
+        reach = np.maximum(reach, np.max(np.where(
+            lineHeights[..., end] <= 0, lineXs[..., end], -np.inf), axis=1))
+    crosses = lineHeights[..., 0] * lineHeights[..., 1] < 0
+    t = lineHeights[..., 0] / np.where(
+        crosses, lineHeights[..., 0] - lineHeights[..., 1], 1)
+    crossXs = lineXs[..., 0] + t * (lineXs[..., 1] - lineXs[..., 0])
+    return np.maximum(reach, np.max(np.where(crosses, crossXs, -np.inf),
+                                    axis=1))
+
+
+def eventWalk(shape, pos, rot=0, rotStep=1e-3, fanSize=256, rotTol=1e-9,
+              maxRot=2*np.pi, poses=False):
+    """
+    Walks shape from pos and rot through the corridor the same way as
+    repeated posRotToShiftRightWithRot does with infinitely small steps,
+    but jumps straight from event to event.
+    Yields (pos, rot, event) at the start and at every event, see walk,
+    the events in between being 'contact' when the shape first
+    touches the corner and 'pivot' when it starts rotating
+    around another node.
+    If poses is True, the fan poses rotStep apart in between the events
+    are yielded as well, with event 'step', for animating the walk.
+
+    The shape is pushed right until it touches the inner corner,
+    from then on it rotates cw around the top node, pushed right as
+    far as the corner lets it. Since moving right doesn't change
+    which node is on top, or if the shape is through, all that depends
+    on the rotation, as does how far right the shape may go
+    (obstacleReach) and how far left it has to stay.
+    These are evaluated for a fan of fanSize rotations rotStep apart
+    at a time, and the first fan point where the shape is through or
+    has hit the left wall is refined with finer fans until the
+    rotation is known to within rotTol.
+    The fans and the poses in them are counted in telemetry as walkFans
+    and fanPoses, the stepped walk counts walkSteps and isInBounds.
+    """
+
+    centers, radii, _, orientations = shape.arcArrays()
+    inside = orientations == shape.o
+    centers = centers[inside]
+    radii = radii[inside]
+
+    # Because of comparing floats, we need a tolerance for machine
+    # precision magnitude of errors, same as in nodesOutOfBounds
+    tol = 1e-13
+
+    def fan(rots, pivot, offset):
+        """
+        Evaluates the walk at the decreasing rotations rots, starting
+        with pivot as top node and offset as the x-position the
+        rotations so far have moved the shape by,
+        plus the rotated x of pivot.
+        """
+
+        telemetry.count('walkFans')
+        telemetry.count('fanPoses', len(rots))
+        rotated = rotatePoints(centers, rots)
+        tops = rotated[..., 1] + radii
+        posYs = 0.5 - np.max(tops, axis=1)
+        pivots = np.argmax(tops, axis=1)
+        pivots[0] = pivot
+
+        # Where the top node changes, the shape stops rotating around
+        # the old one and starts rotating around the new one.
+        # Find the rotation where they are equally high, sin(rot+alpha)
+        # = v, and how far apart in x they are there
+        old = pivots[:-1]
+        new = pivots[1:]
+        diffs = centers[new] - centers[old]
+        lengths = np.linalg.norm(diffs, axis=1)
+        alphas = np.arctan2(diffs[:, 1], diffs[:, 0])
+        v = np.clip((radii[old] - radii[new])
+                    / np.where(lengths > 0, lengths, 1), -1, 1)
+        low = rots[1:]
+        high = rots[:-1]
+        switchRots = (low + high) / 2
+        for base in [np.arcsin(v) - alphas, np.pi - np.arcsin(v) - alphas]:
+            root = base + 2*np.pi * np.ceil((low - base) / (2*np.pi))
+            switchRots = np.where(root <= high, root, switchRots)
+        jumps = np.where(old != new, np.cos(switchRots) * diffs[:, 0]
+                         - np.sin(switchRots) * diffs[:, 1], 0)
+        offsets = offset + np.concatenate([[0], np.cumsum(jumps)])
+
+        # x-position the rotations alone have moved the shape to
+        rotationXs = offsets - rotated[np.arange(len(rots)), pivots, 0]
+        # Total x-position is pushX + rotationX, where pushX is how far
+        # the shape has been pushed right. These are the smallest and
+        # largest pushX that the left wall and the corner allow
+        lefts = -0.5 - np.min(rotated[..., 0] - radii, axis=1) - rotationXs
+        rights = 0.5 - obstacleReach(shape, rots, posYs) - rotationXs
+        through = np.min(rotated[..., 1] - radii, axis=1) + posYs >= -0.5
+
+        return posYs, pivots, offsets, rotationXs, lefts, rights, through
+
+    pos = np.array(pos, dtype=float)
+    if isThrough(shape, pos, rot):
+        yield (pos, rot, 'through')
+        return
+    yield (pos, rot, 'start')
+
+    pivot = np.argmax(rotatePoints(centers, [rot])[0, :, 1] + radii)
+    offset = rotatePoints(centers[pivot], [rot])[0, 0]
+    pushX = pos[0]
+    startRot = rot
+    step = rotStep
+    contact = False
+
+    while rot > startRot - maxRot:
+        fanRots = rot - step * np.arange(fanSize + 1)
+        posYs, pivots, offsets, rotationXs, lefts, rights, through = fan(
+            fanRots, pivot, offset)
+        pushXs = np.maximum(pushX, np.maximum.accumulate(rights))
+
+        # The events that end the walk
+        events = through | (pushXs < lefts - tol)
+        events[0] = False
+
+        # The first contact with the corner and the changes of top node
+        # are recorded as they pass
+        if step == rotStep:
+            end = np.argmax(events) if events.any() else fanSize + 1
+            passing = np.concatenate(
+                [[not contact], pivots[1:] != pivots[:-1]])[:end]
+            for i in range(end):
+                if passing[i]:
+                    event = 'pivot' if contact or i > 0 else 'contact'
+                elif poses and i > 0:
+                    event = 'step'
+                else:
+                    continue
+                yield (np.array([pushXs[i] + rotationXs[i], posYs[i]]),
+                       fanRots[i], event)
+            contact = True
+
+        if not events.any():
+            rot = fanRots[-1]
+            pivot = pivots[-1]
+            offset = offsets[-1]
+            pushX = pushXs[-1]
+            pos = np.array([pushX + rotationXs[-1], posYs[-1]])
+            step = rotStep
+            continue
+
+        i = np.argmax(events)
+        if step > rotTol:
+            # Look closer at the part of the fan before the event
+            rot = fanRots[i - 1]
+            pivot = pivots[i - 1]
+            offset = offsets[i - 1]
+            pushX = pushXs[i - 1]
+            pos = np.array([pushX + rotationXs[i - 1], posYs[i - 1]])
+            step /= fanSize
+            continue
+
+        # Once through, nothing stops the shape going right, so it
+        # stays where it was pushed to, clear of the left wall
+        pushX = min(pushXs[i], max(pushXs[i - 1], lefts[i]))
+        yield (np.array([pushX + rotationXs[i], posYs[i]]), fanRots[i],
+               'through' if through[i] else 'stuck')
+        return
+
+    # Rotated all the way around without getting through
+    yield (pos, rot, 'stuck')
+
+
+def startPos(shape, below=False):
+    """
+    Returns the position where walks start, the shape as far up
+    and as far left as possible, unrotated.
+    If below is True, the shape is as far left as possible
+    just below the starting line instead
     """
 
     topNode = shape.nodes[getTopNodeId(shape)]
@@ -212,8 +620,32 @@ def shapeIsValid(shape):
     rightNode = shape.nodes[getRightNodeId(shape)]
     minimumX = rightNode.pos[0] - topNode.r
 
-    # Place shape as far up and as far left as possible
-    pos = [-0.5 - minimumX, 0.5 - maximumY]
+    if below:
+        return np.array([-0.5 - minimumX, -0.5 - maximumY])
+    return np.array([-0.5 - minimumX, 0.5 - maximumY])
+
+
+def walk(shape, stepped=False, step=0.01, poses=False):
+    """
+    Walks shape through a corridor with width 1 and a 90 degree turn
+    to the right, the corridor initially centered on 0.
+    Lazily yields (pos, rot, event) for the poses along the way, so
+    callers that only need the verdict don't store anything and
+    callers that stop early don't walk the rest.
+    The shape is walked with eventWalk, or in fixed steps with
+    posRotToShiftRightWithRot if stepped is True, when every step
+    is yielded with event 'step'. The steps move the shape step to the
+    right and rotate it by step at a time, larger steps walk faster but
+    are coarser.
+    The first pose has event 'start', the last 'through' if the shape
+    made it through, or 'stuck' where it couldn't go any further.
+    A shape that doesn't fit in the corridor to begin with, or that
+    eventWalk finds through from the start, only yields that pose.
+    If poses is True, eventWalk also yields the poses between its
+    events, see eventWalk.
+    """
+
+    pos = startPos(shape)
     rot = 0
 
     # Check that it is in bounds to begin with
@@ -222,68 +654,102 @@ def shapeIsValid(shape):
             continue
         elif node.pos[0] + pos[0] + node.r > 0.5 or \
                 node.pos[0] + pos[0] - node.r < -0.5:
-            return False
+            yield (pos, rot, 'stuck')
+            return
 
+    if not stepped:
+        yield from eventWalk(shape, pos, rot, poses=poses)
+        return
+
+    yield (pos, rot, 'start')
     while True:
-        deltaPosRot = posRotToShiftRightWithRot(shape, pos, rot)
+        deltaPosRot = posRotToShiftRightWithRot(shape, pos, rot, step, -step)
 
         if deltaPosRot is None:
-            return False
+            yield (pos, rot, 'stuck')
+            return
         else:
-            pos += deltaPosRot[0]
+            pos = pos + deltaPosRot[0]
             rot += deltaPosRot[1]
 
         if isThrough(shape, pos, rot):
-            return True
+            yield (pos, rot, 'through')
+            return
+        yield (pos, rot, 'step')
+
+
+def walkResult(shape, stepped=False, step=0.01):
+    """
+    Walks shape as walk does, without storing the poses.
+    Returns (isThrough, steps, pos, rot) where steps is the number of
+    poses walk yields and pos and rot the last one, where the shape
+    got through or got stuck
+    """
+
+    steps = 0
+    for pos, rot, event in walk(shape, stepped, step):
+        steps += 1
+    return (event == 'through', steps, pos, rot)
+
+
+def shapeIsValid(shape, stepped=False, step=0.01):
+    """
+    Returns true if shape can be moved through a corridor with
+    width 1 and a 90 degree turn to the right
+    The corridor is initially centered on 0
+    The shape is walked with eventWalk, or in fixed steps of step with
+    posRotToShiftRightWithRot if stepped is True
+    """
 
+    telemetry.count('walks')
+    return walkResult(shape, stepped, step)[0]
 
-def getWalk(shape):
+
+def getWalk(shape, stepped=False, step=0.01):
     """
     Returns a sequence of positions and rotations that will get
     the shape through a corrodor with
     width 1 and a 90 degree turn to the right
     The corridor is centered on 0
+    The shape first moves up from below the starting line, then
+    follows walk(shape, stepped, step), the same walk shapeIsValid
+    takes. The event walk is filled in to poses about step apart,
+    pushed right to the corner and then rotating by step at a time
     """
 
-    topNode = shape.nodes[getTopNodeId(shape)]
-    maximumY = topNode.pos[1] + topNode.r
-    rightNode = shape.nodes[getRightNodeId(shape)]
-    minimumX = rightNode.pos[0] - topNode.r
+    start = startPos(shape)
+    below = startPos(shape, below=True)[1]
 
     # Place shape as far left as possible and below the starting line
-    pos = [-0.5 - minimumX, -0.5 - maximumY]
-    rot = 0
-
-    # Initialize arrays to hold positions and rotations
-    poss = [pos.copy()]
-    rots = [rot]
+    poss = [[start[0], below]]
+    rots = [0]
 
+    poses = walk(shape, stepped, step, poses=True)
+    pos, rot, event = next(poses)
     # Check that it is in bounds to begin with
-    if not isInBounds(shape, pos, rot):
+    if event == 'stuck':
         return (poss, rots)
 
     # Move up
-    for y in np.linspace(-0.5 - maximumY, 0.5 - maximumY, 10):
-        poss.append([pos[0], y])
+    for y in np.linspace(below, start[1], 10):
+        poss.append([start[0], y])
         rots.append(0)
 
-    # Place shape as far up and as far left as possible
-    pos = [-0.5 - minimumX, 0.5 - maximumY]
-
-    while True:
-        deltaPosRot = posRotToShiftRightWithRot(shape, pos, rot)
-        # print(deltaPosRot)
-
-        if deltaPosRot is None:
-            return (poss, rots)
-        else:
-            pos += deltaPosRot[0]
-            rot += deltaPosRot[1]
-            poss.append(pos.copy())
-            rots.append(rot)
-
-        if isThrough(shape, pos, rot):
-            return (poss, rots)
+    # The steps, the last one being where it got through
+    for pos, rot, event in poses:
+        if event == 'stuck':
+            break
+        if not stepped:
+            if event == 'step' and rots[-1] - rot < step:
+                continue
+            if event == 'contact':
+                # Pushed right to the corner
+                for x in np.arange(poss[-1][0] + step, pos[0], step):
+                    poss.append([x, pos[1]])
+                    rots.append(rot)
+        poss.append(pos)
+        rots.append(rot)
+    return (poss, rots)
 
 
 def getTopNodeId(shape, pos=np.array([0, 0]), rot=0):
@@ -328,3 +794,29 @@ def getRightNodeId(shape, pos=np.array([0, 0]), rot=0):
             rightNodeID = node.ID
 
     return rightNodeID
+
+
+def getTopNodeIdBatch(shape, poss, rots):
+    """
+    Returns getTopNodeId for every pose, as an array (K,),
+    when poss is an array (K, 2) of positions and rots an array (K,)
+    of rotations
+    """
+
+    _, radii, _, orientations = shape.arcArrays()
+    tops = nodePositions(shape, poss, rots)[..., 1] + radii
+    tops[:, orientations != shape.o] = -np.inf
+    return np.argmax(tops, axis=1)
+
+
+def getRightNodeIdBatch(shape, poss, rots):
+    """
+    Returns getRightNodeId for every pose, as an array (K,),
+    when poss is an array (K, 2) of positions and rots an array (K,)
+    of rotations
+    """
+
+    _, radii, _, orientations = shape.arcArrays()
+    lefts = nodePositions(shape, poss, rots)[..., 0] - radii
+    lefts[:, orientations != shape.o] = np.inf
+    return np.argmin(lefts, axis=1)
@@ -0,0 +1,155 @@
+import json
+import resource
+import time
+from collections import Counter
+
+import numpy as np
+
+
+class Telemetry:
+    """
+    Counts events and times phases of the work done in this process.
+
+    Counts are bumped with count, and phases are timed with
+    `with telemetry.timer(name):`. Timers nest, time spent in an inner
+    timer is only counted to the inner one, so the phase times add up
+    to the time spent in timers.
+
+    Every process has its own, the module level telemetry. Work done
+    on worker processes is sent back with take and added with merge,
+    so the times of that work are summed over the workers.
+    """
+
+    def __init__(self):
+        self.counts = Counter()
+        self.times = Counter()
+        # Names of the timers running, innermost last
+        self.running = []
+        self.started = 0.0
+
+    def count(self, name, n=1):
+        self.counts[name] += n
+
+    def timer(self, name):
+        return Timer(self, name)
+
+    def take(self):
+        """
+        Returns (counts, times) gathered since the last take,
+        and starts over
+        """
+
+        taken = (self.counts, self.times)
+        self.counts = Counter()
+        self.times = Counter()
+        return taken
+
+    def merge(self, taken):
+        "Adds (counts, times) returned by take, of another process"
+
+        counts, times = taken
+        self.counts.update(counts)
+        self.times.update(times)
+
+
+class Timer:
+    "Context manager adding the time spent in it to telemetry.times[name]"
+
+    __slots__ = ('telemetry', 'name')
+
+    def __init__(self, telemetry, name):
+        self.telemetry = telemetry
+        self.name = name
+
+    def __enter__(self):
+        t = self.telemetry
+        now = time.perf_counter()
+        # Pause the timer this one is inside of
+        if t.running:
+            t.times[t.running[-1]] += now - t.started
+        t.running.append(self.name)
+        t.started = now
+
+    def __exit__(self, *exc):
+        t = self.telemetry
+        now = time.perf_counter()
+        t.times[t.running.pop()] += now - t.started
+        t.started = now
+
+
+# The telemetry of this process
+telemetry = Telemetry()
+
+
+def withTelemetry(function, *args):
+    """
+    Returns (function(*args), telemetry.take()), for running
+    function on a worker process and sending back what it did
+    """
+
+    telemetry.take()
+    result = function(*args)
+    return (result, telemetry.take())
+
+
+def peakRSS():
+    """
+    Returns the peak resident set size in bytes of this process and of
+    the largest of its finished or waited for child processes
+    """
+
+    # ru_maxrss is in kilobytes on Linux
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return 1024 * own, 1024 * children
+
+
+def generationRecord(gen, population, seconds):
+    """
+    Returns the telemetry of generation gen as a dictionary, taking
+    what was gathered since the last take.
+    seconds is the wall time the generation took
+    """
+
+    counts, times = telemetry.take()
+    areas = [shape.area for shape in population]
+    rss, childRSS = peakRSS()
+    return {'gen': gen,
+            'seconds': seconds,
+            'times': {name: times[name] for name in
+                      ['mutation', 'simplicity', 'walk', 'sort', 'select']},
+            'counts': {name: counts[name] for name in
+                       ['mutations', 'rejectedMutations', 'walks',
+                        'walkSteps', 'isInBounds', 'walkFans', 'fanPoses',
+                        'coarseChecked', 'coarseRejected', 'fineChecked',
+                        'fineAgreed', 'finestChecked', 'finestRejected']},
+            'popSize': len(population),
+            'bestArea': float(max(areas)) if areas else None,
+            'medianArea': float(np.median(areas)) if areas else None,
+            'peakRSS': rss,
+            'peakChildRSS': childRSS}
+
+
+def writeRecord(file, record):
+    "Writes record as a line of JSON to file"
+
+    file.write(json.dumps(record) + '\n')
+    file.flush()
+
+
+def truncateRecords(file, gen):
+    """
+    Forgets the records of file, opened for reading and appending,
+    of the generations after gen, and whatever was cut off mid-line
+    """
+
+    file.seek(0)
+    kept = []
+    for line in file:
+        if not line.endswith('\n') or json.loads(line)['gen'] > gen:
+            break
+        kept.append(line)
+    file.seek(0)
+    file.truncate()
+    file.writelines(kept)
+    file.flush()
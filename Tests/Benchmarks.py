@@ -0,0 +1,191 @@
+"""
+Benchmarks of the geometry and validity hot paths.
+
+Run from the root directory with
+    python3 -m Tests.Benchmarks --save baseline.json
+and after a change, compare with
+    python3 -m Tests.Benchmarks --compare baseline.json
+which lists every benchmark that got slower than the threshold
+and exits with status 1 if any did.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import re
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from Evaluator import Evaluator
+from Polygon import Polygon
+from Shape import Node
+from Shape import Shape
+from ShapeValidTest import getWalk
+from ShapeValidTest import shapeIsValid
+import main
+
+NODE_COUNTS = [4, 8, 16, 32, 64]
+
+
+def createShape(n):
+    """
+    Returns a shape with n nodes, an ellipse that fits in the corridor,
+    from 8 nodes on with a notch bitten out of its lower right
+    by an outside node
+    """
+
+    # Counter clockwise around the ellipse, starting at the top
+    angles = np.pi / 2 + 2 * np.pi * np.arange(n) / n
+    xs = 0.3 * np.cos(angles)
+    ys = -0.6 + 0.5 * np.sin(angles)
+    r = min(0.1, 0.6 / n)
+
+    nodes = [Node([x, y], r, 1, ID) for ID, (x, y) in enumerate(zip(xs, ys))]
+
+    # Turn the node at the lower right inside out
+    if n >= 8:
+        notch = (5 * n) // 8
+        nodes[notch].o = -1
+    return Shape(nodes)
+
+
+def createPolygon(n):
+    "Returns a polygon with n points on the ellipse of createShape"
+
+    angles = np.pi / 2 + 2 * np.pi * np.arange(n) / n
+    return Polygon(0.3 * np.cos(angles), -0.6 + 0.5 * np.sin(angles))
+
+
+def measure(function, target=0.2):
+    """
+    Returns the time in seconds one call of function takes, the best of
+    a few repeats of as many calls as take about target seconds
+    """
+
+    start = time.perf_counter()
+    function()
+    once = time.perf_counter() - start
+
+    number = max(1, int(target / max(once, 1e-9)))
+    repeat = 1 if once > 10 * target else 3
+    return min(timeit.repeat(function, number=number, repeat=repeat)) / number
+
+
+def offspringFunction(shape):
+    "Returns a function creating an offspring of shape, same every time"
+
+    def function():
+        np.random.seed(0)
+        shape.getOffspring(bigMutations=True)
+    return function
+
+
+def polygonOffspringFunction(polygon):
+    "Returns a function creating 100 offspring of polygon, same every time"
+
+    def function():
+        np.random.seed(0)
+        polygon.createOffspringBatch(100)
+    return function
+
+
+def gaRun():
+    "Runs main.py's genetic algorithm for 10 generations"
+
+    np.random.seed(0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.evolve(main.createOriginal(), 10, 20, Evaluator())
+
+
+def benchmarks():
+    "Returns a dictionary with the functions to time, by name"
+
+    functions = {}
+    for n in NODE_COUNTS:
+        shape = createShape(n)
+        polygon = createPolygon(n)
+        functions[f"recalculate/{n}"] = shape.recalculate
+        functions[f"isSimple/{n}"] = shape.isSimple
+        functions[f"getOffspring/{n}"] = offspringFunction(shape)
+        functions[f"shapeIsValid/{n}"] = lambda shape=shape: \
+            shapeIsValid(shape)
+        functions[f"getWalk/{n}"] = lambda shape=shape: getWalk(shape)
+        functions[f"polygonArea/{n}"] = polygon.calculateArea
+        functions[f"polygonOffspring/{n}"] = \
+            polygonOffspringFunction(polygon)
+    functions["ga/10"] = gaRun
+    return functions
+
+
+def runBenchmarks(pattern=None):
+    "Times the benchmarks with names matching pattern, all if None"
+
+    results = {}
+    for name, function in benchmarks().items():
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        results[name] = measure(function)
+        print(f"{name:20} {results[name]*1e3:12.3f} ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the benchmarks that take more than 1 + threshold times as
+    long as in baseline. Returns True if there were any.
+    """
+
+    regressions = False
+    for name, seconds in results.items():
+        if name not in baseline:
+            continue
+        ratio = seconds / baseline[name]
+        if ratio > 1 + threshold:
+            regressions = True
+            print(f"REGRESSION {name}: {baseline[name]*1e3:.3f} ms -> "
+                  f"{seconds*1e3:.3f} ms ({ratio:.2f}x)")
+        elif ratio < 1 / (1 + threshold):
+            print(f"Faster {name}: {baseline[name]*1e3:.3f} ms -> "
+                  f"{seconds*1e3:.3f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def parseArgs():
+    parser = argparse.ArgumentParser(
+        description="Time the geometry and validity hot paths")
+    parser.add_argument('--save', help="write the results to this file")
+    parser.add_argument('--compare',
+                        help="compare with the results in this file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative slowdown counted as a regression")
+    parser.add_argument('--filter', default=None,
+                        help="only run benchmarks matching this regex")
+    return parser.parse_args()
+
+
+def runMain():
+    args = parseArgs()
+    results = runBenchmarks(args.filter)
+
+    if args.save is not None:
+        with open(args.save, 'w') as f:
+            json.dump({'python': platform.python_version(),
+                       'numpy': np.__version__,
+                       'machine': platform.machine(),
+                       'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+                       'results': results}, f, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    runMain()
@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+import numpy as np
+
+from Evaluator import Evaluator
+from main import createOriginal
+from main import evolve
+
+
+def arrays(shapes):
+    return [shape.toArray() for shape in shapes]
+
+
+def sameArrays(a, b):
+    return len(a) == len(b) and all(np.array_equal(s, t)
+                                    for s, t in zip(a, b))
+
+
+def testResume():
+    filename = os.path.join(tempfile.mkdtemp(), 'run.npz')
+
+    with Evaluator() as evaluator:
+        # Straight through
+        np.random.seed(0)
+        population, halloffame = evolve(createOriginal(), 8, 20, evaluator)
+        state = np.random.get_state()
+
+        # Stopped after 5 generations, then resumed with another seed
+        np.random.seed(0)
+        evolve(createOriginal(), 5, 20, evaluator, checkpoint=filename,
+               checkpointEvery=2)
+        np.random.seed(1)
+        resumedPopulation, resumedHalloffame = evolve(
+            createOriginal(), 8, 20, evaluator, checkpoint=filename,
+            resume=True)
+        resumedState = np.random.get_state()
+
+    print(f"Same population, should be True, is "
+          f"{sameArrays(arrays(population), arrays(resumedPopulation))}")
+    print(f"Same hall of fame, should be True, is "
+          f"{sameArrays(arrays(halloffame), arrays(resumedHalloffame))}")
+    print(f"Same random state, should be True, is "
+          f"{np.array_equal(state[1], resumedState[1])}")
+
+
+def testTelemetry():
+    filename = os.path.join(tempfile.mkdtemp(), 'run.npz')
+
+    def crash(gen, population):
+        if gen == 5:
+            raise KeyboardInterrupt
+        return population
+
+    log = io.StringIO()
+    with Evaluator() as evaluator:
+        # Stopped after logging gen 5, the last checkpoint being of gen 3
+        try:
+            evolve(createOriginal(), 8, 20, evaluator, log,
+                   checkpoint=filename, checkpointEvery=2, migrate=crash)
+        except KeyboardInterrupt:
+            pass
+        evolve(createOriginal(), 8, 20, evaluator, log, checkpoint=filename,
+               resume=True)
+
+    gens = [json.loads(line)['gen'] for line in log.getvalue().splitlines()]
+    print(f"Generations logged once each, should be {list(range(8))}, "
+          f"is {gens}")
+
+
+testResume()
+testTelemetry()
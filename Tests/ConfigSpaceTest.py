@@ -0,0 +1,75 @@
+import numpy as np
+import warnings
+from time import time
+
+from ConfigSpaceValidTest import configGrid
+from ConfigSpaceValidTest import configSpaceIsValid
+from ConfigSpaceValidTest import configSpaceSearch
+from Shape import Node
+from Shape import Shape
+from ShapeValidTest import shapeIsValid
+from main import createOriginal
+
+
+def createSquare(side):
+    "Returns a square with sides side, rounded at the corners"
+
+    r = 0.05
+    half = side / 2 - r
+    nodes = [Node([half, half], r, 1, 0)]
+    nodes.append(Node([-half, half], r, 1, 1))
+    nodes.append(Node([-half, -half], r, 1, 2))
+    nodes.append(Node([half, -half], r, 1, 3))
+    return Shape(nodes)
+
+
+def testVerdicts():
+    print(f"Original is valid, should be True, is "
+          f"{configSpaceIsValid(createOriginal())}")
+    print(f"Square of side 0.9 is valid, should be True, is "
+          f"{configSpaceIsValid(createSquare(0.9))}")
+    print(f"Square of side 1.1 is valid, should be False, is "
+          f"{configSpaceIsValid(createSquare(1.1))}")
+
+
+def testSearched():
+    s = createOriginal()
+    grid = configGrid(s)
+    isThrough, free = configSpaceSearch(s, grid)
+    print(f"Only part of the grid was checked, should be True, is "
+          f"{np.count_nonzero(free) < free.size} "
+          f"({np.count_nonzero(free)} of {free.size} cells)")
+    print(f"Grid has rotation 0, should be True, is "
+          f"{np.min(np.abs(grid[2])) == 0}")
+
+
+def testAgainstWalk():
+    # Offspring like the ones the GA makes, to cross-check the walk with
+    np.random.seed(1)
+    population = [createOriginal()]
+    shapes = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for _ in range(40):
+            parent = population[np.random.randint(len(population))]
+            shapes.append(parent.getOffspring(True))
+            if shapeIsValid(shapes[-1]):
+                population.append(shapes[-1])
+
+        start = time()
+        walked = [shapeIsValid(shape) for shape in shapes]
+        walkTime = time() - start
+        start = time()
+        filled = [configSpaceIsValid(shape) for shape in shapes]
+        gridTime = time() - start
+
+    agree = np.sum(np.array(walked) == np.array(filled))
+    onlyGrid = np.sum(np.array(filled) & ~np.array(walked))
+    print(f"Verdicts of walk and grid agree for {agree} of {len(shapes)}, "
+          f"{onlyGrid} only valid on the grid (walk: {walkTime:.2f} s, "
+          f"grid: {gridTime:.2f} s)")
+
+
+testVerdicts()
+testSearched()
+testAgainstWalk()
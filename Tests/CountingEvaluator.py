@@ -0,0 +1,13 @@
+from Evaluator import Evaluator
+
+
+class CountingEvaluator(Evaluator):
+    "Evaluator that counts the shapes it is asked to validate"
+
+    def __init__(self, workers=0, cache=None):
+        super().__init__(workers, cache)
+        self.asked = 0
+
+    def areValid(self, shapes, validator=None):
+        self.asked += len(shapes)
+        return super().areValid(shapes, validator)
@@ -0,0 +1,36 @@
+import numpy as np
+from time import time
+
+from Shape import Node
+from Shape import Shape
+from Evaluator import Evaluator
+
+
+def createPopulation():
+    nodes = [Node([0.4, 0], 0.1, 1, 0)]
+    nodes.append(Node([-0.0, 0], 0.1, 1, 1))
+    nodes.append(Node([-0.0, -0.9], 0.1, 1, 2))
+    nodes.append(Node([0.4, -0.9], 0.1, 1, 3))
+    return [Shape(nodes) for _ in range(8)]
+
+
+def testSerialEqualsParallel():
+    results = []
+    for workers in [0, 2]:
+        np.random.seed(0)
+        start = time()
+        with Evaluator(workers) as evaluator:
+            offspring = evaluator.getOffspring(createPopulation(),
+                                               bigMutations=True)
+            valid = evaluator.areValid(offspring)
+        print(f"Workers: {workers}, time taken: {time()-start:.2f} seconds")
+        results.append(([s.toArray() for s in offspring], valid))
+
+    sameShapes = all(np.array_equal(a, b)
+                     for a, b in zip(results[0][0], results[1][0]))
+    print(f"Same offspring, should be True, is {sameShapes}")
+    print(f"Same validity, should be True, is {results[0][1] == results[1][1]}")
+
+
+if __name__ == "__main__":
+    testSerialEqualsParallel()
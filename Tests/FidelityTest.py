@@ -0,0 +1,77 @@
+import io
+import json
+import numpy as np
+import warnings
+
+from Evaluator import Evaluator
+from Evaluator import getValidator
+from Shape import Shape
+from main import createOriginal
+from main import evolve
+
+
+def createOffspring(count):
+    "Offspring like the ones the GA makes"
+
+    np.random.seed(1)
+    population = [createOriginal()]
+    shapes = []
+    for _ in range(count):
+        parent = population[np.random.randint(len(population))]
+        shapes.append(parent.getOffspring(True))
+        if getValidator('events')(shapes[-1]):
+            population.append(shapes[-1])
+    return shapes
+
+
+def testNames():
+    for name in ['stepped:0.05', 'events']:
+        getValidator(name)
+    bad = 0
+    for name in ['events:0.05', 'stepped:-1', 'walk', 'grid']:
+        try:
+            getValidator(name)
+        except ValueError:
+            bad += 1
+    print(f"Bad names rejected, should be 4, is {bad}")
+
+
+def testAgreement():
+    names = ['events', 'stepped:0.05', 'stepped:0.02', 'stepped',
+             'stepped:0.005']
+    with Evaluator() as evaluator:
+        rates, seconds = evaluator.agreement(createOffspring(60), names)
+    for a in names:
+        print(f"{a:>13}: {seconds[a]:5.2f} s, agrees with " +
+              ", ".join(f"{b} {rates[a, b]:.2f}" for b in names if b != a))
+    print(f"Agreement is symmetric, should be True, is "
+          f"{all(rates[a, b] == rates[b, a] for a in names for b in names)}")
+
+
+def testEvolve():
+    log = io.StringIO()
+    np.random.seed(0)
+    with Evaluator(validator='stepped', coarse='stepped:0.05',
+                   finest='stepped:0.005') as evaluator:
+        population, halloffame = evolve(createOriginal(), 6, 10,
+                                        evaluator, log)
+    print(f"Population size, should be 11, is {len(population)}")
+    counts = {}
+    for line in log.getvalue().splitlines():
+        for name, count in json.loads(line)['counts'].items():
+            counts[name] = counts.get(name, 0) + count
+    print(f"Coarse checks: {counts['coarseChecked']}, rejected: "
+          f"{counts['coarseRejected']}, fine checks of those passing: "
+          f"{counts['fineChecked']}, agreed: {counts['fineAgreed']}")
+    confirmed = all(getValidator('stepped:0.005')(Shape.fromArray(
+        shape.toArray())) for shape in halloffame)
+    print(f"Hall of fame valid at the finest step, should be True, is "
+          f"{confirmed} ({counts['finestChecked']} checked, "
+          f"{counts['finestRejected']} rejected)")
+
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore')
+    testNames()
+    testAgreement()
+    testEvolve()
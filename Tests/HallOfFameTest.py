@@ -0,0 +1,71 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from Evaluator import Evaluator
+from HallOfFame import HallOfFame
+from HallOfFame import HallOfFameWriter
+from main import createOriginal
+from main import evolve
+
+
+def sameShapes(a, b):
+    return len(a) == len(b) and all(
+        np.array_equal(a[i].toArray(), b[i].toArray()) for i in range(len(a)))
+
+
+def testRecorder():
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, 'hof.nodes')
+    checkpoint = os.path.join(directory, 'run.npz')
+
+    with Evaluator() as evaluator:
+        np.random.seed(0)
+        _, halloffame = evolve(createOriginal(), 8, 20, evaluator)
+
+        # Stopped after 5 generations, having recorded gen 5 already,
+        # with the checkpoint from after gen 3
+        np.random.seed(0)
+        with HallOfFameWriter(filename) as recorder:
+            evolve(createOriginal(), 4, 20, evaluator, checkpoint=checkpoint,
+                   recorder=recorder)
+        shutil.copy(checkpoint, checkpoint + '.gen3')
+        with HallOfFameWriter(filename, resume=True) as recorder:
+            evolve(createOriginal(), 6, 20, evaluator, checkpoint=checkpoint,
+                   resume=True, recorder=recorder)
+        shutil.copy(checkpoint + '.gen3', checkpoint)
+
+        with HallOfFameWriter(filename, resume=True) as recorder:
+            evolve(createOriginal(), 8, 20, evaluator, checkpoint=checkpoint,
+                   resume=True, recorder=recorder)
+
+    recorded = HallOfFame(filename)
+    print(f"Generations, should be [1 3 5 7], is {recorded.generations}")
+    print(f"Same as in memory, should be True, is "
+          f"{sameShapes(halloffame, recorded)}")
+    print(f"By generation, should be True, is "
+          f"{np.array_equal(recorded.byGeneration(5).toArray(), halloffame[2].toArray())}")
+
+    # A crash between writing the nodes and the index
+    with open(filename, 'ab') as f:
+        f.write(np.ones((3, 4)).tobytes())
+    print(f"Unindexed nodes ignored, should be 4, is {len(HallOfFame(filename))}")
+    with HallOfFameWriter(filename, resume=True) as recorder:
+        recorder.append(9, halloffame[0])
+    recorded.refresh()
+    print(f"Appended after them, should be True, is "
+          f"{np.array_equal(recorded[-1].toArray(), halloffame[0].toArray())}")
+
+    # Resuming without a checkpoint starts over
+    with Evaluator() as evaluator, \
+            HallOfFameWriter(filename, resume=True) as recorder:
+        np.random.seed(0)
+        evolve(createOriginal(), 4, 20, evaluator,
+               checkpoint=checkpoint + '.missing', resume=True,
+               recorder=recorder)
+    print(f"Generations after resuming without a checkpoint, "
+          f"should be [1 3], is {HallOfFame(filename).generations}")
+
+
+testRecorder()
@@ -0,0 +1,35 @@
+import numpy as np
+from time import time
+
+from Hallway import Hallway
+from ShapeValidTest import shapeIsValid
+
+
+def testHammersley():
+    h = Hallway(64, 0.01)
+    print(f"Area of Hammersley's sofa, should be about "
+          f"{np.pi / 2 + 2 / np.pi:.4f}, is {h.area:.4f}")
+
+    s = h.toShape()
+    print(f"Shape fit is simple, should be True, is {s.isSimple()}")
+    print(f"Shape fit is valid, should be True, is {shapeIsValid(s)}")
+    print(f"Shape fit area, should be a bit less than {h.area:.4f}, "
+          f"is {s.area:.4f}")
+
+
+def testOptimize():
+    h = Hallway(16, 0.02)
+    before = h.area
+    start = time()
+    after = h.optimize()
+    print(f"Optimized area larger, should be True, is {after > before} "
+          f"({before:.4f} -> {after:.4f} in {time() - start:.2f} s)")
+
+    # What was kept up to date as the path moved, against from scratch
+    fresh = Hallway(16, 0.02, h.path)
+    print(f"Same sofa as from scratch, should be True, is "
+          f"{np.array_equal(fresh.sofaMask(), h.sofaMask())}")
+
+
+testHammersley()
+testOptimize()
@@ -0,0 +1,41 @@
+import numpy as np
+
+from Islands import evolveIslands
+from ShapeValidTest import shapeIsValid
+from main import createOriginal
+
+
+def run():
+    np.random.seed(0)
+    return evolveIslands(createOriginal(), 6, 10, 3, migrateEvery=2)
+
+
+def testIslands():
+    population, halloffame = run()
+    print(f"Population of all islands, should be 3 * 11, is "
+          f"{len(population)}")
+    print(f"Hall of fame length, should be 3, is {len(halloffame)}")
+    print(f"Best is valid, should be True, is {shapeIsValid(population[0])}")
+    print(f"Best area: {population[0].area}, "
+          f"original area: {createOriginal().area}")
+
+    # Migrations wait for each other, so timing doesn't matter
+    again, _ = run()
+    same = len(again) == len(population) and all(
+        np.array_equal(s.toArray(), t.toArray())
+        for s, t in zip(population, again))
+    print(f"Same result when run again, should be True, is {same}")
+
+
+def testFinest():
+    # Islands whose finest check rejects a generation leave a gap
+    np.random.seed(0)
+    _, halloffame = evolveIslands(createOriginal(), 6, 10, 3, migrateEvery=2,
+                                  finest='stepped:0.005')
+    print(f"Hall of fame length with a finest check, should be 3, is "
+          f"{len(halloffame)}")
+
+
+if __name__ == "__main__":
+    testIslands()
+    testFinest()
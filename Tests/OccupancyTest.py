@@ -0,0 +1,92 @@
+import numpy as np
+import warnings
+from time import time
+
+import ConfigSpaceValidTest
+from ConfigSpaceValidTest import configGrid
+from ConfigSpaceValidTest import configSpaceSearch
+from Occupancy import Occupancy
+from ShapeValidTest import isInBounds
+from ShapeValidTest import isInBoundsBatch
+from ShapeValidTest import walk
+from Tests.Benchmarks import createShape
+from main import createOriginal
+
+
+def randomPoses(count):
+    poss = np.random.uniform([-1, -1.5], [1.5, 1], (count, 2))
+    rots = np.random.uniform(-2, 0.5, count)
+    return poss, rots
+
+
+def testVerdicts():
+    np.random.seed(0)
+    for shape in [createOriginal(), createShape(16), createShape(64)]:
+        occupancy = Occupancy(shape)
+        poss, rots = randomPoses(2000)
+        exact = isInBoundsBatch(shape, poss, rots)
+        verdicts = occupancy.classify(poss, rots)
+        wrong = (verdicts > 0) & ~exact | (verdicts < 0) & exact
+        print(f"{len(shape.nodes)} nodes, no pose misclassified, "
+              f"should be True, is {not np.any(wrong)} "
+              f"({np.mean(verdicts == 0):.2f} unsure)")
+        fast = isInBoundsBatch(shape, poss, rots, occupancy)
+        print(f"{len(shape.nodes)} nodes, same batch verdicts, "
+              f"should be True, is {np.array_equal(exact, fast)}")
+
+
+def testWalkPoses():
+    # Poses of a walk touch the walls, so they are unsure but still right
+    shape = createOriginal()
+    occupancy = Occupancy(shape)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        poses = [(pos, rot) for pos, rot, _ in walk(shape, stepped=True)]
+    same = all(isInBounds(shape, pos, rot) ==
+               isInBounds(shape, pos, rot, occupancy) for pos, rot in poses)
+    print(f"Same verdicts along a walk, should be True, is {same}")
+
+
+def testGridSearch():
+    # Large shapes are searched with an Occupancy, the verdicts are the same
+    shape = createShape(64)
+    grid = configGrid(shape)
+    default = ConfigSpaceValidTest.occupancyNodes
+    times = []
+    results = []
+    for nodes in [default, len(shape.nodes) + 1]:
+        ConfigSpaceValidTest.occupancyNodes = nodes
+        start = time()
+        results.append(configSpaceSearch(shape, grid))
+        times.append(time() - start)
+    ConfigSpaceValidTest.occupancyNodes = default
+    same = results[0][0] == results[1][0] and \
+        np.array_equal(results[0][1], results[1][1])
+    print(f"Same grid search with an Occupancy, should be True, is {same} "
+          f"(with: {times[0] * 1000:.0f} ms, "
+          f"without: {times[1] * 1000:.0f} ms)")
+
+
+def testTimes():
+    np.random.seed(1)
+    for n in [5, 16, 64]:
+        shape = createOriginal() if n == 5 else createShape(n)
+        occupancy = Occupancy(shape)
+        poss, rots = randomPoses(500)
+        start = time()
+        for pos, rot in zip(poss, rots):
+            isInBounds(shape, pos, rot)
+        exactTime = time() - start
+        start = time()
+        for pos, rot in zip(poss, rots):
+            isInBounds(shape, pos, rot, occupancy)
+        fastTime = time() - start
+        print(f"{len(shape.nodes)} nodes, 500 random poses: "
+              f"exact {exactTime * 1000:.0f} ms, "
+              f"occupancy {fastTime * 1000:.0f} ms")
+
+
+testVerdicts()
+testWalkPoses()
+testGridSearch()
+testTimes()
@@ -0,0 +1,17 @@
+import numpy as np
+
+from main import createOriginal
+
+
+def createShapes(count, seed=0):
+    """
+    Returns the shape main.py starts from followed by count offspring,
+    each of a random shape before it
+    """
+
+    np.random.seed(seed)
+    shapes = [createOriginal()]
+    for i in range(count):
+        shapes.append(shapes[np.random.randint(len(shapes))].getOffspring(
+            bigMutations=True))
+    return shapes
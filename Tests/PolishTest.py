@@ -0,0 +1,38 @@
+import numpy as np
+
+from Polish import polish
+from Shape import Shape
+from ShapeValidTest import shapeIsValid
+from main import createOriginal
+from main import evolve
+from Tests.CountingEvaluator import CountingEvaluator
+
+
+def testAreas():
+    np.random.seed(0)
+    s = createOriginal()
+    array = s.toArray()
+    array[4, 2] += 1e-6
+    up = Shape.fromArray(array).area
+    array[4, 2] -= 2e-6
+    down = Shape.fromArray(array).area
+    print(f"d area / d r of the notch, should be {(up - down) / 2e-6:.6f}, "
+          f"is {s.areaGradient()[4, 2]:.6f}")
+
+
+def testPolish():
+    evaluator = CountingEvaluator()
+    np.random.seed(0)
+    population, _ = evolve(createOriginal(), 10, 20, evaluator)
+    best = population[0]
+
+    evaluator.asked = 0
+    polished = polish(best, evaluator)
+    print(f"Area, evolved: {best.area:.4f}, polished: {polished.area:.4f}, "
+          f"walks: {evaluator.asked}")
+    print(f"Polished is valid, should be True, is {shapeIsValid(polished)}")
+    print(f"Polished is simple, should be True, is {polished.isSimple()}")
+
+
+testAreas()
+testPolish()
@@ -0,0 +1,92 @@
+import numpy as np
+from time import time
+
+from LineMath import linesIntersect
+from Polygon import Polygon
+from Polygon import polygonAreas
+
+
+def createPolygon():
+    xs = list(np.linspace(0, -0.5, 10)) + list(np.linspace(-0.5, 0, 10)) + \
+        [-0.6, -0.6]
+    ys = list(np.linspace(0, -1.0, 20)) + [-1.0, 0.2]
+    return Polygon(xs, ys)
+
+
+def createPentagon():
+    "A small pentagon, so moved points often reach the edges next to them"
+
+    angles = np.pi / 2 + 2 * np.pi * np.arange(5) / 5
+    return Polygon(0.05 * np.cos(angles), 0.05 * np.sin(angles))
+
+
+def isSimple(xs, ys):
+    """
+    Returns True if no two edges of the polygon xs, ys that aren't
+    next to each other cross
+    """
+
+    n = len(xs)
+    edges = [np.array([[xs[k - 1], ys[k - 1]], [xs[k], ys[k]]])
+             for k in range(n)]
+    return not any(linesIntersect(edges[i], edges[j])
+                   for i in range(n) for j in range(i + 2, n)
+                   if (i, j) != (0, n - 1))
+
+
+def replayed(p, mutate, deltas):
+    """
+    Returns p.createOffspring() with np.random.random returning the
+    draws of createOffspringBatch for one offspring
+    """
+
+    draws = []
+    for u, delta in zip(mutate, deltas):
+        draws.append(0.0 if u else 1.0)
+        if u:
+            draws.append(delta / (2 * 0.05) + 0.5)
+    random = np.random.random
+    np.random.random = lambda size=None: draws.pop(0)
+    try:
+        return p.createOffspring()
+    finally:
+        np.random.random = random
+
+
+def testAgainstSerial(p, count):
+
+    np.random.seed(0)
+    xs, ys = p.createOffspringBatch(count)
+
+    # The same draws, one offspring at a time
+    np.random.seed(0)
+    mutate = np.random.random((count, len(p.xs))) <= 0.1
+    deltas = (np.random.random((count, len(p.xs), 2)) - 0.5) * 2 * 0.05
+    same = True
+    for i in range(count):
+        q = replayed(p, mutate[i], deltas[i])
+        same &= np.allclose(q.xs, xs[i]) and np.allclose(q.ys, ys[i])
+    print(f"{len(p.xs)} points, same as createOffspring, should be True, "
+          f"is {same}")
+    simple = all(isSimple(x, y) for x, y in zip(xs, ys))
+    print(f"{len(p.xs)} points, every offspring simple, should be True, "
+          f"is {simple}")
+    print(f"Same areas, should be True, is "
+          f"{np.allclose(polygonAreas(xs, ys)[:5], [Polygon(x, y).area for x, y in zip(xs[:5], ys[:5])])}")
+
+
+def timeOffspring():
+    p = createPolygon()
+    start = time()
+    for _ in range(1000):
+        p.createOffspring()
+    middle = time()
+    p.createOffspringBatch(1000)
+    end = time()
+    print(f"Time for 1000 offspring, one at a time: {middle-start:.3f} s, "
+          f"batched: {end-middle:.3f} s")
+
+
+testAgainstSerial(createPolygon(), 200)
+testAgainstSerial(createPentagon(), 5000)
+timeOffspring()
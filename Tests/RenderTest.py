@@ -0,0 +1,52 @@
+import os
+import tempfile
+import numpy as np
+from time import time
+from PIL import Image
+
+from HallOfFame import HallOfFame
+from HallOfFame import HallOfFameWriter
+from Render import renderHallOfFame
+from Render import renderWalk
+from Render import saveGif
+from main import createOriginal
+from ShapeValidTest import getWalk
+
+
+def testWalk():
+    s = createOriginal()
+    poss, rots = getWalk(s)
+
+    start = time()
+    serial = renderWalk(s, poss, rots, workers=0)
+    middle = time()
+    parallel = renderWalk(s, poss, rots, workers=4)
+    end = time()
+    print(f"Frames, should be {len(rots)}, is {len(parallel)}")
+    same = all(np.array_equal(a, b) for a, b in zip(serial, parallel))
+    print(f"Same frames in parallel, should be True, is {same}")
+    print(f"Time taken, serial: {middle-start:.3f} s, "
+          f"4 workers: {end-middle:.3f} s")
+
+    filename = os.path.join(tempfile.mkdtemp(), 'walk.gif')
+    saveGif(parallel, filename, fps=15)
+    print(f"GIF frames, should be {len(rots)}, is "
+          f"{Image.open(filename).n_frames}")
+
+
+def testHallOfFame():
+    filename = os.path.join(tempfile.mkdtemp(), 'hof.nodes')
+    with HallOfFameWriter(filename) as recorder:
+        for gen in range(1, 10, 2):
+            recorder.append(gen, createOriginal())
+    frames = renderHallOfFame(HallOfFame(filename), workers=2)
+    listFrames = renderHallOfFame([createOriginal()] * 5, workers=0)
+    print(f"Frames, should be 5, is {len(frames)}")
+    # Only the generation in the title differs
+    print(f"Same as from a list, should be True, is "
+          f"{np.array_equal(frames[0], listFrames[0])}")
+
+
+if __name__ == "__main__":
+    testWalk()
+    testHallOfFame()
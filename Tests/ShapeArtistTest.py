@@ -0,0 +1,88 @@
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from time import time
+
+from LineMath import rotMat
+from PlotShape import ShapeArtist
+from PlotShape import makeArtist
+from ShapeValidTest import getWalk
+from main import createOriginal
+
+
+def testPose():
+    s = createOriginal()
+    fig, ax = plt.subplots()
+    artist = ShapeArtist(s, ax)
+    pos = np.array([0.3, -0.2])
+    rot = -0.7
+    artist.setPose(pos, rot)
+
+    # Where the lines end up, in data coordinates
+    toData = artist.lines.get_transform() - ax.transData
+    drawn = np.array([toData.transform(line)
+                      for line in artist.lines.get_segments()])
+    expected = np.array([[np.matmul(rotMat(rot), point) + pos
+                          for point in line] for line in s.lines])
+    print(f"Lines moved like rotMat moves them, should be True, is "
+          f"{np.allclose(drawn, expected)}")
+    plt.close(fig)
+
+
+def rebuildFrame(shape, ax, pos, rot):
+    "Draws a frame the way animateWalk used to, from scratch"
+
+    ax.clear()
+    for node in shape.nodes:
+        for artist in makeArtist(node, pos, rot):
+            ax.add_artist(artist)
+    lines = np.array([[np.matmul(rotMat(rot), point) +
+                       pos for point in line] for line in shape.lines])
+    for line in lines:
+        ax.plot(line[:, 0], line[:, 1])
+    ax.set_ylim(-2, 2)
+    ax.set_xlim(-2, 2)
+    ax.plot([0.5, 0.5, 2], [-2, -0.5, -0.5], 'k')
+    ax.plot([-0.5, -0.5, 2], [-2, 0.5, 0.5], 'k')
+
+
+def timeFrames():
+    s = createOriginal()
+    poss, rots = getWalk(s)
+    poss = np.array(poss, dtype=float)
+
+    fig, ax = plt.subplots()
+    start = time()
+    for pos, rot in zip(poss, rots):
+        rebuildFrame(s, ax, pos, rot)
+        fig.canvas.draw()
+    rebuilt = time() - start
+    plt.close(fig)
+
+    # As FuncAnimation does when blitting: the background once,
+    # then only the moving artists
+    fig, ax = plt.subplots()
+    ax.set_ylim(-2, 2)
+    ax.set_xlim(-2, 2)
+    ax.plot([0.5, 0.5, 2], [-2, -0.5, -0.5], 'k')
+    ax.plot([-0.5, -0.5, 2], [-2, 0.5, 0.5], 'k')
+    artist = ShapeArtist(s, ax, animated=True)
+    start = time()
+    fig.canvas.draw()
+    background = fig.canvas.copy_from_bbox(ax.bbox)
+    for pos, rot in zip(poss, rots):
+        fig.canvas.restore_region(background)
+        artist.setPose(pos, rot)
+        for a in artist.artists:
+            ax.draw_artist(a)
+        fig.canvas.blit(ax.bbox)
+    blitted = time() - start
+    plt.close(fig)
+
+    print(f"Time for {len(rots)} frames, rebuilt: {rebuilt:.3f} s, "
+          f"blitted: {blitted:.3f} s")
+
+
+testPose()
+timeFrames()
@@ -0,0 +1,42 @@
+import numpy as np
+from time import time
+
+from ShapeBatch import ShapeBatch
+from Tests.Offspring import createShapes
+
+
+def testAgainstShape():
+    shapes = createShapes(100)
+    batch = ShapeBatch.fromShapes(shapes)
+
+    areas = np.array([s.area for s in shapes])
+    print(f"Largest area difference, should be ~0, is {np.max(np.abs(batch.area - areas))}")
+    orientations = np.array([s.o for s in shapes])
+    print(f"Orientation mismatches, should be 0, is {np.sum(batch.o != orientations)}")
+    simple = np.array([s.isSimple() for s in shapes])
+    print(f"isSimple mismatches, should be 0, is {np.sum(batch.isSimple() != simple)}")
+
+    # Make one shape not simple by swapping two nodes, creating a bow tie
+    array = shapes[0].toArray()
+    array[[1, 2]] = array[[2, 1]]
+    batch = ShapeBatch.fromArrays([array, shapes[1].toArray()])
+    print(f"Should be [False, True], is {batch.isSimple()}")
+
+
+def timeRecalculate():
+    shapes = createShapes(100)
+    batch = ShapeBatch.fromShapes(shapes)
+
+    start = time()
+    for i in range(10):
+        for s in shapes:
+            s.recalculate()
+    middle = time()
+    for i in range(10):
+        batch.recalculate()
+    end = time()
+    print(f"Time taken, shapes: {middle-start:.3f} s, batch: {end-middle:.3f} s")
+
+
+testAgainstShape()
+timeRecalculate()
@@ -0,0 +1,55 @@
+import io
+import json
+import time
+import numpy as np
+
+from Evaluator import Evaluator
+from Telemetry import Telemetry
+from main import createOriginal
+from main import evolve
+
+
+def testTimers():
+    t = Telemetry()
+    with t.timer('outer'):
+        time.sleep(0.02)
+        with t.timer('inner'):
+            time.sleep(0.05)
+    counts, times = t.take()
+    print(f"Outer time without inner, should be about 0.02, is "
+          f"{times['outer']:.3f}")
+    print(f"Inner time, should be about 0.05, is {times['inner']:.3f}")
+    print(f"Empty after take, should be 0, is {len(t.take()[1])}")
+
+
+def runLogged(workers):
+    log = io.StringIO()
+    np.random.seed(0)
+    with Evaluator(workers) as evaluator:
+        evolve(createOriginal(), 4, 20, evaluator, log)
+    return [json.loads(line) for line in log.getvalue().splitlines()]
+
+
+def testLog():
+    records = runLogged(0)
+    print(f"Lines written, should be 4, is {len(records)}")
+    print(f"First record: {records[0]}")
+
+    walked = sum(r['counts']['walks'] for r in records)
+    print(f"Shapes walked, should be more than 0, is {walked}")
+    # The event walk evaluates fans of poses, not steps
+    fans = sum(r['counts']['walkFans'] for r in records)
+    poses = sum(r['counts']['fanPoses'] for r in records)
+    print(f"Fans of poses, should be more than 0, is {fans} ({poses} poses)")
+    phases = sum(records[-1]['times'].values())
+    print(f"Phase times within the generation time, should be True, is "
+          f"{phases <= records[-1]['seconds']}")
+
+    # The workers send back what they counted
+    pooled = runLogged(2)
+    same = all(r['counts'] == s['counts'] for r, s in zip(records, pooled))
+    print(f"Same counts with workers, should be True, is {same}")
+
+
+testTimers()
+testLog()
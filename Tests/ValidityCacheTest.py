@@ -0,0 +1,68 @@
+import os
+import tempfile
+import numpy as np
+
+from ValidityCache import ValidityCache
+from main import createOriginal
+from main import evolve
+from Tests.CountingEvaluator import CountingEvaluator
+
+
+def testKeys():
+    cache = ValidityCache()
+    array = createOriginal().toArray()
+    nudged = array + 1e-12
+    moved = array.copy()
+    moved[0, 0] += 1e-3
+
+    print(f"Nudged shape has same key, should be True, is "
+          f"{cache.key(array) == cache.key(nudged)}")
+    print(f"Moved shape has same key, should be False, is "
+          f"{cache.key(array) == cache.key(moved)}")
+    stepped = ValidityCache(walker='stepped')
+    print(f"Other walker has same key, should be False, is "
+          f"{cache.key(array) == stepped.key(array)}")
+
+
+def testEviction():
+    cache = ValidityCache(maxMemory=2)
+    cache.set('a', True)
+    cache.set('b', False)
+    cache.get('a')
+    cache.set('c', True)
+    print(f"Least recently used is evicted, should be None, is "
+          f"{cache.get('b')}")
+    print(f"Others are kept, should be (True, None), is {cache.get('a')}")
+
+    filename = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+    with ValidityCache(filename, maxDisk=10) as cache:
+        for i in range(25):
+            cache.set(str(i), i % 2 == 0, length=float(i))
+    with ValidityCache(filename) as cache:
+        count = cache.connection.execute(
+            "SELECT COUNT(*) FROM validity").fetchone()[0]
+        print(f"Entries on disk, should be 10, is {count}")
+        print(f"Newest kept on disk, should be (True, 24.0), is "
+              f"{cache.get('24')}")
+
+
+def testWarmRestart():
+    filename = os.path.join(tempfile.mkdtemp(), 'cache.sqlite')
+
+    results = []
+    for run in range(2):
+        np.random.seed(0)
+        with ValidityCache(filename) as cache:
+            evaluator = CountingEvaluator(cache=cache)
+            population, _ = evolve(createOriginal(), 4, 20, evaluator)
+            results.append([s.toArray() for s in population])
+            print(f"Run {run}, asked: {evaluator.asked}, "
+                  f"walked: {cache.misses}")
+
+    same = all(np.array_equal(a, b) for a, b in zip(*results))
+    print(f"Same population, should be True, is {same}")
+
+
+testKeys()
+testEviction()
+testWarmRestart()
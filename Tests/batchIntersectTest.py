@@ -0,0 +1,66 @@
+import numpy as np
+
+from LineMath import linesIntersect
+from LineMath import segmentIntersectsArc
+from LineMath import arcsIntersect
+from LineMath import linesIntersectBatch
+from LineMath import segmentIntersectsArcBatch
+from LineMath import arcsIntersectBatch
+from LineMath import segmentBoxes
+from LineMath import arcBoxes
+from LineMath import boxesOverlap
+from LineMath import sweepAndPrune
+
+
+np.random.seed(0)
+N = 20
+
+lines = np.random.normal(size=(N, 2, 2))
+centers = np.random.normal(size=(N, 2))
+radii = np.abs(np.random.normal(size=N)) + 0.1
+angles = np.random.uniform(0, 2*np.pi, size=(N, 2))
+orientations = np.random.choice([-1, 1], size=N)
+
+print(" - - - Batch against scalar - - - ")
+matrix = linesIntersectBatch(lines[:, None], lines[None, :])
+mismatches = sum(matrix[i, j] != linesIntersect(lines[i], lines[j])
+                 for i in range(N) for j in range(N))
+print(f"linesIntersect mismatches, should be 0, is {mismatches}")
+
+matrix = segmentIntersectsArcBatch(lines[:, None], centers, radii,
+                                   angles, orientations)
+mismatches = sum(matrix[i, j] != segmentIntersectsArc(
+    lines[i], centers[j], radii[j], angles[j], orientations[j])
+    for i in range(N) for j in range(N))
+print(f"segmentIntersectsArc mismatches, should be 0, is {mismatches}")
+
+matrix = arcsIntersectBatch(centers[:, None], radii[:, None], angles[:, None],
+                            orientations[:, None],
+                            centers, radii, angles, orientations)
+mismatches = sum(matrix[i, j] != arcsIntersect(
+    centers[i], radii[i], angles[i], orientations[i],
+    centers[j], radii[j], angles[j], orientations[j])
+    for i in range(N) for j in range(N) if i != j)
+print(f"arcsIntersect mismatches, should be 0, is {mismatches}")
+
+print(" - - - Broad phase - - - ")
+boxes = np.concatenate([segmentBoxes(lines),
+                        arcBoxes(centers, radii, angles, orientations)])
+first, second = sweepAndPrune(boxes)
+pairs = set(zip(first, second))
+bruteForce = set((i, j) for i in range(2*N) for j in range(i+1, 2*N)
+                 if boxesOverlap(boxes[i], boxes[j]))
+print(f"Sweep and prune finds every overlapping pair, should be True, is {pairs == bruteForce}")
+matrix = segmentIntersectsArcBatch(lines[:, None], centers, radii,
+                                   angles, orientations)
+missed = sum((i, N + j) not in pairs for i, j in zip(*np.nonzero(matrix)))
+print(f"Intersecting pairs missed by the broad phase, should be 0, is {missed}")
+
+print(" - - - Edge cases - - - ")
+line1 = np.array([[0, 0], [0, 1]])
+line2 = np.array([[0, 1], [1, 1]])
+print(f"Line endpoint touches line endpoint, is: {linesIntersectBatch(line1, line2)}")
+line = np.array([[0, 0], [1, 0]])
+print(f"Line endpoint touches arc endpoint, is: {segmentIntersectsArcBatch(line, np.array([0, 0]), 1, [0, 1], 1)}")
+c = np.array([0, 0])
+print(f"Concentric arcs sharing an angle range, should be true, is {arcsIntersectBatch(c, 1, [1, 2], 1, c, 1, [1.5, 3], 1)}")
@@ -0,0 +1,58 @@
+import numpy as np
+from time import time
+
+from ShapeValidTest import isInBounds
+from ShapeValidTest import isInBoundsBatch
+from ShapeValidTest import nodesOutOfBounds
+from ShapeValidTest import nodesOutOfBoundsBatch
+from ShapeValidTest import getTopNodeId
+from ShapeValidTest import getTopNodeIdBatch
+from ShapeValidTest import getRightNodeId
+from ShapeValidTest import getRightNodeIdBatch
+from Tests.Offspring import createShapes
+
+
+def testAgainstScalar():
+    shapes = createShapes(30)
+    poss = np.random.uniform(-0.6, 0.9, size=(200, 2))
+    rots = np.random.uniform(-2, 0.5, size=200)
+
+    inBoundsMismatches = 0
+    quadrantMismatches = 0
+    idMismatches = 0
+    for s in shapes:
+        inBounds = isInBoundsBatch(s, poss, rots)
+        quadrants = nodesOutOfBoundsBatch(s, poss, rots)
+        tops = getTopNodeIdBatch(s, poss, rots)
+        rights = getRightNodeIdBatch(s, poss, rots)
+        for k in range(len(rots)):
+            if inBounds[k] != isInBounds(s, poss[k], rots[k]):
+                inBoundsMismatches += 1
+            found = sorted(map(list, np.argwhere(quadrants[k]) + [0, 1]))
+            if found != sorted(nodesOutOfBounds(s, poss[k], rots[k])):
+                quadrantMismatches += 1
+            if tops[k] != getTopNodeId(s, poss[k], rots[k]) or \
+                    rights[k] != getRightNodeId(s, poss[k], rots[k]):
+                idMismatches += 1
+
+    print(f"inBounds mismatches, should be 0, is {inBoundsMismatches}")
+    print(f"Quadrant mismatches, should be 0, is {quadrantMismatches}")
+    print(f"Top and right node mismatches, should be 0, is {idMismatches}")
+
+
+def timeInBounds():
+    s = createShapes(30)[10]
+    poss = np.random.uniform(-0.6, 0.9, size=(1000, 2))
+    rots = np.random.uniform(-2, 0.5, size=1000)
+
+    start = time()
+    [isInBounds(s, pos, rot) for pos, rot in zip(poss, rots)]
+    middle = time()
+    isInBoundsBatch(s, poss, rots)
+    end = time()
+    print(f"Time taken, one at a time: {middle-start:.3f} s, "
+          f"batch: {end-middle:.3f} s")
+
+
+testAgainstScalar()
+timeInBounds()
@@ -0,0 +1,47 @@
+import numpy as np
+from copy import deepcopy
+from time import time
+
+from Shape import Shape
+from main import createOriginal
+
+
+def testClone():
+    s = createOriginal()
+    c = s.clone()
+
+    c.nodes[0].pos += 0.05
+    c.nodes[1].r += 0.01
+    c.updateNode(0)
+    c.updateNode(1)
+    print(f"Original untouched, should be True, is "
+          f"{np.array_equal(s.toArray(), createOriginal().toArray())}")
+    print(f"Original area untouched, should be True, is "
+          f"{s.area == createOriginal().area}")
+
+    # The clone's state is the same as if it was calculated from scratch
+    fresh = Shape.fromArray(c.toArray())
+    same = all(np.array_equal(a, b) for a, b in zip(c.lines, fresh.lines))
+    print(f"Same lines as recalculated, should be True, is {same}")
+    print(f"Same area as recalculated, should be True, is "
+          f"{np.isclose(c.area, fresh.area)}")
+
+    print(f"Has no __dict__, should be False, is "
+          f"{hasattr(s, '__dict__') or hasattr(s.nodes[0], '__dict__')}")
+
+
+def timeClone():
+    s = createOriginal()
+    start = time()
+    for i in range(2000):
+        deepcopy(s)
+    middle = time()
+    for i in range(2000):
+        s.clone()
+    end = time()
+    print(f"Time taken, deepcopy: {middle-start:.3f} s, "
+          f"clone: {end-middle:.3f} s")
+
+
+testClone()
+timeClone()
@@ -0,0 +1,54 @@
+import numpy as np
+from time import time
+
+from Shape import Node
+from Shape import Shape
+from ShapeValidTest import shapeIsValid
+from main import createOriginal
+
+
+def rectangle(width, height):
+    "A rectangle with rounded corners, with the top left corner in (0,0)"
+
+    r = 0.05
+    nodes = [Node([width - r, -r], r, 1, 0)]
+    nodes.append(Node([r, -r], r, 1, 1))
+    nodes.append(Node([r, -height + r], r, 1, 2))
+    nodes.append(Node([width - r, -height + r], r, 1, 3))
+    return Shape(nodes)
+
+
+def testVerdicts():
+    s = rectangle(0.9, 0.9)
+    print(f"Small square, should be True, is {shapeIsValid(s)}")
+    s = rectangle(0.9, 3)
+    print(f"Long rectangle, should be False, is {shapeIsValid(s)}")
+    s = rectangle(0.6, 1.3)
+    print(f"Narrow rectangle, should be True, is {shapeIsValid(s)}")
+    s = createOriginal()
+    print(f"Notched shape, should be True, is {shapeIsValid(s)}")
+
+
+def testAgainstStepped():
+    np.random.seed(0)
+    shapes = [createOriginal()]
+    for i in range(40):
+        shapes.append(shapes[np.random.randint(len(shapes))].getOffspring(
+            bigMutations=True))
+
+    start = time()
+    events = [shapeIsValid(s) for s in shapes]
+    middle = time()
+    stepped = [shapeIsValid(s, stepped=True) for s in shapes]
+    end = time()
+    print(f"Time taken, events: {middle-start:.2f} s, "
+          f"stepped: {end-middle:.2f} s")
+
+    # Both walks follow the same path, the stepped one in finite steps
+    print(f"Same verdicts, should be True, is {events == stepped} "
+          f"(events: {sum(events)}, stepped: {sum(stepped)} "
+          f"of {len(shapes)} valid)")
+
+
+testVerdicts()
+testAgainstStepped()
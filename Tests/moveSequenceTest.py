@@ -0,0 +1,91 @@
+import numpy as np
+from copy import deepcopy
+from time import time
+
+from Polygon import Polygon
+from PolygonValidTest import moveSequence
+from PolygonValidTest import isThrough
+
+
+def outOfBounds(p):
+    return any(np.logical_and(p.xs > 0, p.ys < 0)) or any(p.ys > 1) or \
+        any(p.xs < -1)
+
+
+def recursiveSequence(p, dTheta, seq=[], depth=0):
+    "The recursive search moveSequence replaced, with its tmP bug fixed"
+
+    if isThrough(p):
+        return seq
+    if outOfBounds(p):
+        return None
+
+    tmP = deepcopy(p)
+    moveBy = np.array([-tmP.xs[depth], -tmP.ys[depth]])
+    tmP.translate(moveBy)
+    if any(np.logical_and(tmP.xs > 0, tmP.ys < 0)) or any(tmP.ys > 1):
+        return None
+
+    newSeq = list(seq) + [(tmP.xs, tmP.ys)]
+    while True:
+        rv = recursiveSequence(tmP, dTheta, newSeq, depth+1)
+        if rv is not None:
+            return rv
+        tmP.rotate((0, 0), -dTheta)
+        newSeq = newSeq + [(tmP.xs, tmP.ys)]
+        if outOfBounds(tmP):
+            return None
+
+
+def polygons():
+    xs = list(np.linspace(0, -0.5, 10)) + list(np.linspace(-0.5, 0, 10)) + \
+        [-0.6, -0.6]
+    ys = list(np.linspace(0, -1.0, 20)) + [-1.0, 0.2]
+    yield "test1", Polygon(xs, ys)
+    yield "square", Polygon([0, -0.5, -0.5, 0], [0, 0, -0.5, -0.5])
+    yield "too wide", Polygon([0, -1.2, -1.2, 0], [0, 0, -0.5, -0.5])
+    yield "long", Polygon([0, -0.6, -0.6, 0], [0, 0, -2.0, -2.0])
+
+
+def sameSequence(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    return len(a) == len(b) and all(
+        np.allclose(x, y, atol=1e-9) for sa, sb in zip(a, b)
+        for x, y in zip(sa, sb))
+
+
+def testAgainstRecursive():
+    for dTheta in [0.2, 0.1]:
+        for name, p in polygons():
+            start = time()
+            expected = recursiveSequence(p, dTheta)
+            recursive = time() - start
+            start = time()
+            seq = moveSequence(p, dTheta)
+            iterative = time() - start
+            print(f"{name}, dTheta {dTheta}: same sequence as recursive, "
+                  f"should be True, is {sameSequence(seq, expected)} "
+                  f"(found: {seq is not None}, recursive: {recursive:.3f} s, "
+                  f"iterative: {iterative:.3f} s)")
+
+
+def testManyPoints():
+    # One recursion level per point was too deep for the old search
+    n = 3000
+    xs = np.concatenate([np.zeros(n), [-0.5, -0.5]])
+    ys = np.concatenate([np.linspace(0, -0.9, n), [-0.9, 0]])
+    p = Polygon(xs, ys)
+    seq = moveSequence(p, 0.01)
+    through = seq is not None and all(np.array(seq[-1][1]) >= -1e-12)
+    try:
+        recursiveSequence(p, 0.01)
+        deep = False
+    except RecursionError:
+        deep = True
+    print(f"{n + 2} point polygon gets through, should be True, "
+          f"is {through} (too deep for recursion: {deep})")
+
+
+testAgainstRecursive()
+testManyPoints()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from main import createOriginal
+from main import nextGeneration
+from Tests.CountingEvaluator import CountingEvaluator
+
+
+def eagerNextGeneration(population, evaluator, popSize):
+    "Validates every candidate before sorting, as main.py used to"
+
+    offspring = evaluator.getOffspring(population, bigMutations=True)
+    newPopulation = []
+    for s, t in zip(population, offspring):
+        newPopulation.append(s)
+        newPopulation.append(t)
+    valid = evaluator.areValid(newPopulation)
+    population = [s for s, isValid in zip(newPopulation, valid) if isValid]
+    population.sort(key=lambda x: x.area, reverse=True)
+    del population[popSize:-1]
+    return population
+
+
+def testAgainstEager():
+    popSize = 20
+    lazy = CountingEvaluator()
+    eager = CountingEvaluator()
+
+    np.random.seed(0)
+    population = [createOriginal() for _ in range(popSize)]
+    population = nextGeneration(population, lazy, popSize)
+    same = True
+    for gen in range(5):
+        state = np.random.get_state()
+        lazyPopulation = nextGeneration(population, lazy, popSize)
+        np.random.set_state(state)
+        eagerPopulation = eagerNextGeneration(population, eager, popSize)
+
+        same &= len(lazyPopulation) == len(eagerPopulation) and all(
+            np.array_equal(s.toArray(), t.toArray())
+            for s, t in zip(lazyPopulation, eagerPopulation))
+        population = lazyPopulation
+
+    print(f"Same populations, should be True, is {same}")
+    print(f"Walks, lazy: {lazy.asked}, eager: {eager.asked}")
+
+
+testAgainstEager()
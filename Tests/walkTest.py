@@ -0,0 +1,76 @@
+import numpy as np
+
+from Shape import Node
+from Shape import Shape
+from ShapeValidTest import getWalk
+from ShapeValidTest import isThrough
+from ShapeValidTest import shapeIsValid
+from ShapeValidTest import walk
+from ShapeValidTest import walkResult
+from Telemetry import telemetry
+from Tests.Offspring import createShapes
+from main import createOriginal
+
+
+def createRectangle(width, height):
+    nodes = [Node([width/2, 0], 0.01, 1, 0)]
+    nodes.append(Node([-width/2, 0], 0.01, 1, 1))
+    nodes.append(Node([-width/2, -height], 0.01, 1, 2))
+    nodes.append(Node([width/2, -height], 0.01, 1, 3))
+    return Shape(nodes)
+
+
+def testEvents():
+    s = createOriginal()
+    events = [event for _, _, event in walk(s)]
+    print(f"Events walked: {events}")
+    print(f"Starts and ends, should be True, is "
+          f"{events[0] == 'start' and events[-1] == 'through'}")
+
+    stuck = walkResult(createRectangle(0.5, 3))
+    print(f"Long rectangle gets stuck, should be False, is {stuck[0]}")
+    print(f"Stuck at rotation {stuck[3]:.3f} after {stuck[1]} poses")
+
+
+def testLazy():
+    s = createOriginal()
+    telemetry.take()
+    poses = walk(s, stepped=True)
+    for _ in range(3):
+        next(poses)
+    counts, _ = telemetry.take()
+    print(f"Steps walked for 3 poses, should be 2, is {counts['walkSteps']}")
+
+    isThrough, steps, pos, rot = walkResult(s, stepped=True)
+    poss, rots = getWalk(s, stepped=True)
+    print(f"getWalk ends where walk does, should be True, is "
+          f"{np.array_equal(poss[-1], pos) and rots[-1] == rot}")
+    print(f"Same verdict as shapeIsValid, should be True, is "
+          f"{isThrough == shapeIsValid(s, stepped=True)}")
+    # getWalk has 11 poses moving up instead of the start,
+    # and leaves out the pose it got stuck at, which is the last step
+    length = steps + 10 if isThrough else steps + 9
+    print(f"getWalk length, should be {length}, is {len(rots)}")
+
+
+
+def testThrough():
+    shapes = createShapes(100)
+    valid = [s for s in shapes if shapeIsValid(s)]
+    ends = [getWalk(s) for s in valid]
+    through = [s for s, (poss, rots) in zip(valid, ends)
+               if isThrough(s, poss[-1], rots[-1])]
+    print(f"getWalk of valid shapes ends through, should be {len(valid)}, "
+          f"is {len(through)}")
+
+    poss, rots = getWalk(createOriginal())
+    # Leaving out moving up from below the starting line
+    moves = np.linalg.norm(np.diff(poss[10:], axis=0), axis=1)
+    turns = -np.diff(rots)
+    print(f"Poses close together, should be True, is "
+          f"{max(moves) < 0.05 and max(turns) < 0.02}")
+
+
+testEvents()
+testLazy()
+testThrough()
@@ -0,0 +1,147 @@
+import hashlib
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+
+class ValidityCache:
+    """
+    Remembers shapeIsValid verdicts, and optionally walk lengths,
+    of shapes given as (n, 4) node arrays (see Shape.toArray).
+
+    Shapes are keyed on a hash of their node array, rounded to multiples
+    of quantum, and of walker, the name of the walk that checks them,
+    so verdicts of different walks are never mixed up.
+    The node order is kept as it is, since the walk breaks ties
+    by node order.
+
+    The maxMemory most recently used entries are kept in memory.
+    If filename is given, entries are also stored in an SQLite database
+    there, which keeps the maxDisk most recently used ones and
+    can be reused by later runs.
+    """
+
+    def __init__(self, filename=None, maxMemory=10000, maxDisk=100000,
+                 walker='events', quantum=1e-9):
+        self.maxMemory = maxMemory
+        self.maxDisk = maxDisk
+        self.walker = walker
+        self.quantum = quantum
+
+        # Least recently used first
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self.connection = None
+        # Writes not yet committed to disk
+        self.pending = 0
+        if filename is not None:
+            self.connection = sqlite3.connect(filename)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS validity (key TEXT PRIMARY KEY, "
+                "valid INTEGER NOT NULL, length REAL, used INTEGER NOT NULL)")
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS validityUsed ON validity (used)")
+            # Counts uses, to know which entries were used least recently
+            self.clock = self.connection.execute(
+                "SELECT COALESCE(MAX(used), 0) FROM validity").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        "Writes everything to disk and closes the database"
+
+        if self.connection is not None:
+            self.flush()
+            self.connection.close()
+            self.connection = None
+
+    def key(self, array):
+        "Returns the key of the shape with node array array"
+
+        quantized = np.round(np.asarray(array, dtype=float) / self.quantum)
+        quantized = np.ascontiguousarray(quantized, dtype=np.int64)
+        digest = hashlib.sha1(self.walker.encode())
+        digest.update(quantized.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns (valid, length) stored for key, length being None
+        if it wasn't stored, or None if key isn't in the cache
+        """
+
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return self.memory[key]
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT valid, length FROM validity WHERE key = ?",
+                (key,)).fetchone()
+            if row is not None:
+                self.clock += 1
+                self.connection.execute(
+                    "UPDATE validity SET used = ? WHERE key = ?",
+                    (self.clock, key))
+                self.wrote()
+                self.hits += 1
+                entry = (bool(row[0]), row[1])
+                self.remember(key, entry)
+                return entry
+
+        self.misses += 1
+        return None
+
+    def set(self, key, valid, length=None):
+        "Stores the verdict valid, and the walk length if known, for key"
+
+        entry = (bool(valid), length)
+        self.remember(key, entry)
+
+        if self.connection is not None:
+            self.clock += 1
+            self.connection.execute(
+                "INSERT OR REPLACE INTO validity VALUES (?, ?, ?, ?)",
+                (key, int(entry[0]), length, self.clock))
+            self.wrote()
+
+    def remember(self, key, entry):
+        "Puts entry in memory, forgetting the least recently used if full"
+
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxMemory:
+            self.memory.popitem(last=False)
+
+    def wrote(self):
+        "Counts a write, committing them to disk every now and then"
+
+        self.pending += 1
+        if self.pending >= 1000:
+            self.flush()
+
+    def flush(self):
+        """
+        Commits the writes to disk, evicting the least recently used
+        entries if there are more than maxDisk
+        """
+
+        if self.connection is None:
+            return
+
+        count = self.connection.execute(
+            "SELECT COUNT(*) FROM validity").fetchone()[0]
+        if count > self.maxDisk:
+            self.connection.execute(
+                "DELETE FROM validity WHERE key IN (SELECT key FROM validity "
+                "ORDER BY used LIMIT ?)", (count - self.maxDisk,))
+        self.connection.commit()
+        self.pending = 0
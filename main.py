@@ -1,98 +1,392 @@
 import numpy as np
-from copy import deepcopy
+import argparse
+import os
 import time
 
-import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
-import matplotlib.animation as animation
-
-from PlotShape import plotShape, animateWalk
-from ShapeValidTest import shapeIsValid
+from Render import renderHallOfFame, renderWalk, saveGif
 from ShapeValidTest import getWalk
 from Shape import Node, Shape
+from Evaluator import Evaluator, getValidator
+from ValidityCache import ValidityCache
+from Telemetry import telemetry, generationRecord, writeRecord
+from Telemetry import truncateRecords
+from Checkpoint import saveCheckpoint, loadCheckpoint
+from HallOfFame import HallOfFameWriter, HallOfFame
+from Polish import polishPopulation
+from Hallway import Hallway
+
+
+def createOriginal():
+    "Returns the shape that the first population is made of"
 
-#plt.style.use('fivethirtyeight')
-np.random.seed(0)
+    nodes = [Node([0.4, 0], 0.1, 1, 0)]
+    nodes.append(Node([-0.3, 0], 0.1, 1, 1))
+    nodes.append(Node([-0.3, -1.0], 0.1, 1, 2))
+    nodes.append(Node([0.4, -1.0], 0.1, 1, 3))
+    nodes.append(Node([0.6, -0.5], 0.4, -1, 3))
+    return Shape(nodes)
 
-start = time.time()
 
-# Create original shape
-nodes = [Node([0.4, 0], 0.1, 1, 0)]
-nodes.append(Node([-0.3, 0], 0.1, 1, 1))
-nodes.append(Node([-0.3, -1.0], 0.1, 1, 2))
-nodes.append(Node([0.4, -1.0], 0.1, 1, 3))
-nodes.append(Node([0.6, -0.5], 0.4, -1, 3))
-original = Shape(nodes)
+def firstValid(candidates, order, valid, evaluator, count, validator=None):
+    """
+    Returns the indices of the first count valid candidates,
+    visiting them in order, checked by validator, see Evaluator.areValid.
+    valid holds the validity of every candidate, None if not yet known,
+    and is filled in as candidates are validated. Only the candidates
+    that would be needed if they all turned out valid are validated,
+    so no walk is wasted on a shape that is cut anyway.
+    """
 
+    while True:
+        found = []
+        unknown = []
+        for i in order:
+            if len(found) + len(unknown) == count:
+                break
+            if valid[i] is None:
+                unknown.append(i)
+            elif valid[i]:
+                found.append(i)
 
+        if not unknown:
+            return found
 
-# Generate original population
-population = []
-popSize = 50
-for _ in range(popSize):
-    population.append(deepcopy(original))
+        for i, isValid in zip(unknown, evaluator.areValid(
+                [candidates[i] for i in unknown], validator)):
+            valid[i] = isValid
 
-# For saving the best
-halloffame = []
 
-# run N generations
-N = 300
-for gen in range(N):
+def nextGeneration(population, evaluator, popSize, parentsValid=True):
+    """
+    Returns the population of the generation after population.
+    parentsValid is the validity of the shapes in population, which
+    is known since they survived the generation before
+    If evaluator has a coarse check, every offspring is screened with it
+    first, and only those passing it are checked with the validator,
+    as far as selection needs. How many of those the validator agrees
+    with is counted in telemetry as fineChecked and fineAgreed.
+    """
+
     # Repopulate
-    newPopulation = []
-    for s in population:
-        newPopulation.append(s)
-        t = s.getOffspring(bigMutations=True)
-        newPopulation.append(t)
+    offspring = evaluator.getOffspring(population, bigMutations=True)
+    candidates = []
+    valid = []
+    with telemetry.timer('select'):
+        for s, t in zip(population, offspring):
+            candidates.append(s)
+            candidates.append(t)
+            valid.append(parentsValid)
+            # An offspring where no mutation stuck is as valid as its parent
+            if np.array_equal(s.toArray(), t.toArray()):
+                valid.append(parentsValid)
+            else:
+                valid.append(None)
+
+    # Offspring failing the coarse check are dropped unchecked by the validator
+    screened = []
+    if evaluator.coarse is not None:
+        with telemetry.timer('select'):
+            unknown = [i for i, isValid in enumerate(valid) if isValid is None]
+            for i, isValid in zip(unknown, evaluator.areValid(
+                    [candidates[i] for i in unknown], evaluator.coarse)):
+                if isValid:
+                    screened.append(i)
+                else:
+                    valid[i] = False
+            telemetry.count('coarseChecked', len(unknown))
+            telemetry.count('coarseRejected', len(unknown) - len(screened))
+
+    # Visit according to area, killing those that fail the test,
+    # until popSize of them have passed
+    with telemetry.timer('sort'):
+        order = sorted(range(len(candidates)),
+                       key=lambda i: candidates[i].area, reverse=True)
+    with telemetry.timer('select'):
+        survivors = firstValid(candidates, order, valid, evaluator, popSize)
+
+        # The smallest valid shape survives as well
+        if survivors:
+            rest = order[order.index(survivors[-1]) + 1:]
+            survivors += firstValid(candidates, rest[::-1], valid,
+                                    evaluator, 1)
+
+    checked = [i for i in screened if valid[i] is not None]
+    telemetry.count('fineChecked', len(checked))
+    telemetry.count('fineAgreed', sum(valid[i] for i in checked))
+
+    return [candidates[i] for i in survivors]
+
+
+def finestBest(population, evaluator):
+    """
+    Returns the largest shape of population that the finest check of
+    evaluator finds valid, or None if there is none.
+    Without a finest check, population[0] is returned, which is the
+    largest unless migrants were let in.
+    How many shapes were checked and rejected is counted in telemetry
+    as finestChecked and finestRejected.
+    """
+
+    if evaluator.finest is None:
+        return population[0] if population else None
+
+    order = sorted(range(len(population)),
+                   key=lambda i: population[i].area, reverse=True)
+    valid = [None] * len(population)
+    best = firstValid(population, order, valid, evaluator, 1,
+                      evaluator.finest)
+    checked = [isValid for isValid in valid if isValid is not None]
+    telemetry.count('finestChecked', len(checked))
+    telemetry.count('finestRejected', checked.count(False))
+    return population[best[0]] if best else None
+
+
+def evolve(original, N, popSize, evaluator, log=None, checkpoint=None,
+           checkpointEvery=10, resume=False, migrate=None, recorder=None):
+    """
+    Runs the genetic algorithm for N generations, starting from
+    popSize copies of original.
+    Returns the final population and the hall of fame,
+    the best shape of every other generation.
+    If log, a file, is given, the telemetry of every generation is
+    written to it as a line of JSON, see Telemetry.generationRecord.
+    When resuming, it has to be open for reading as well, and the
+    records after the checkpoint are dropped from it
+    If checkpoint, a filename, is given, the state is saved there
+    every checkpointEvery generations and after the last one.
+    If resume is True and the checkpoint exists, the run continues
+    from it, with the same results as if it had never stopped.
+    If migrate is given, the population is replaced by
+    migrate(gen, population) at the end of every generation.
+    If recorder, a HallOfFameWriter, is given, the hall of fame is
+    written to it as the run goes instead of kept in memory,
+    and the hall of fame returned is empty.
+    The hall of fame gets the largest shape the finest check of
+    evaluator finds valid, see finestBest.
+    """
+
+    start = time.time()
+    # Forget what was gathered before this run
+    telemetry.take()
+
+    if resume and checkpoint is not None and os.path.exists(checkpoint):
+        lastGen, population, halloffame, parentsValid = \
+            loadCheckpoint(checkpoint)
+        print(f"Resuming after gen: {lastGen}")
+        # Shapes recorded after the checkpoint are recorded again
+        if recorder is not None:
+            recorder.truncate(lastGen)
+    else:
+        lastGen = -1
+        # Nothing to resume, so whatever the recorder kept is stale
+        if recorder is not None:
+            recorder.truncate(lastGen)
+
+        # Generate original population
+        population = []
+        for _ in range(popSize):
+            population.append(original.clone())
+
+        # For saving the best
+        halloffame = []
+
+        # All of the first population are as valid as the original
+        parentsValid = evaluator.areValid([original])[0]
+
+    # Generations logged after the checkpoint are logged again
+    if resume and log is not None:
+        truncateRecords(log, lastGen)
+
+    for gen in range(lastGen + 1, N):
+        genStart = time.perf_counter()
+        population = nextGeneration(population, evaluator, popSize,
+                                    parentsValid)
+        parentsValid = True
+        # Confirmed before the record, so it counts to this generation
+        if gen % 2 == 1:
+            best = finestBest(population, evaluator)
+
+        record = generationRecord(gen, population,
+                                  time.perf_counter() - genStart)
+        if log is not None:
+            writeRecord(log, record)
+
+        # Print first ten generations
+        #if gen < 10:
+            #print(f"Gen: {gen}, pop: {len(population)}")
+            ##print(f"time since start: {time.time() - start}")
+        # Save best if multiple of 2
+        if gen % 2 == 1:
+            if recorder is not None and best is not None:
+                recorder.append(gen, best)
+            elif best is not None:
+                halloffame.append(best.clone())
+            print(f"Gen: {gen}, pop: {len(population)}")
+            print(f"time since start: {time.time() - start}")
+
+        if migrate is not None:
+            population = migrate(gen, population)
+
+        if checkpoint is not None and \
+                ((gen + 1) % checkpointEvery == 0 or gen == N - 1):
+            saveCheckpoint(checkpoint, gen, population, halloffame,
+                           parentsValid)
+
+    return population, halloffame
+
+
+def saveHallOfFame(halloffame, filename='hof.gif', workers=0):
+    """
+    Saves an animation of the shapes in the hall of fame,
+    a HallOfFame or a list of shapes, rendered by workers processes
+    """
+
+    saveGif(renderHallOfFame(halloffame, workers), filename, fps=5)
+
+
+def validatorName(name):
+    "Returns name if it names a validator, see Evaluator.getValidator"
+
+    getValidator(name)
+    return name
+
 
-    population = newPopulation
+def parseArgs():
+    parser = argparse.ArgumentParser(
+        description="Evolve a sofa that fits around the corner")
+    parser.add_argument('--generations', type=int, default=300,
+                        help="number of generations to run")
+    parser.add_argument('--popsize', type=int, default=50,
+                        help="number of shapes kept every generation")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes for offspring, validity "
+                        "and rendering, 0 runs everything in this process")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--validator', default='events', type=validatorName,
+                        help="how validity is decided: the event walk "
+                        "(events) or the stepped walk (stepped), which "
+                        "takes a step after a colon, as in stepped:0.05")
+    parser.add_argument('--coarse', default=None, type=validatorName,
+                        help="validator to screen every offspring with "
+                        "before --validator, as in stepped:0.05")
+    parser.add_argument('--finest', default=None, type=validatorName,
+                        help="validator the shapes of the hall of fame "
+                        "are confirmed with, as in stepped:0.005")
+    parser.add_argument('--cache', default=None,
+                        help="file to keep validity verdicts in between runs, "
+                        "by default they are only kept in memory")
+    parser.add_argument('--telemetry', default=None,
+                        help="file to write the telemetry of every "
+                        "generation to, as lines of JSON")
+    parser.add_argument('--checkpoint', default=None,
+                        help="file to save the state of the run to, "
+                        "as .npz")
+    parser.add_argument('--checkpoint-every', type=int, default=10,
+                        help="generations between checkpoints")
+    parser.add_argument('--resume', action='store_true',
+                        help="continue the run saved in --checkpoint")
+    parser.add_argument('--halloffame', default='hof.nodes',
+                        help="file to record the best shapes to as the run "
+                        "goes, see HallOfFame.py")
+    parser.add_argument('--polish', type=int, default=0,
+                        help="number of the largest shapes to climb the area "
+                        "gradient with after the run")
+    parser.add_argument('--islands', type=int, default=0,
+                        help="populations of --popsize evolving in their "
+                        "own processes, 0 evolves a single population")
+    parser.add_argument('--migrate-every', type=int, default=10,
+                        help="generations between migrations of islands")
+    parser.add_argument('--migrants', type=int, default=2,
+                        help="best shapes an island sends to the next one")
+    parser.add_argument('--hallway', type=int, default=0,
+                        help="instead of evolving shapes, optimize how the "
+                        "sofa moves, at this many rotations, and fit a shape "
+                        "to the largest sofa that moves so, see Hallway.py")
+    args = parser.parse_args()
 
-    # Kill those that fail the test
-    for i in range(len(population))[::-1]:
-        if not shapeIsValid(population[i]):
-            del population[i]
+    # Islands run their own single process populations
+    if args.islands > 0:
+        for flag, isSet in [('--workers', args.workers != 0),
+                            ('--cache', args.cache is not None),
+                            ('--telemetry', args.telemetry is not None),
+                            ('--checkpoint', args.checkpoint is not None),
+                            ('--resume', args.resume)]:
+            if isSet:
+                parser.error(f"{flag} can't be used with --islands")
+    return args
 
-    # Sort according to area
-    population.sort(key=lambda x: x.area,reverse=True)
 
-    # Print first ten generations
-    #if gen < 10:
-        #print(f"Gen: {gen}, pop: {len(population)}")
-        ##print(f"time since start: {time.time() - start}")
-    # Save best if multiple of 2
-    if gen % 2 == 1:
-        halloffame.append(deepcopy(population[0]))
-        print(f"Gen: {gen}, pop: {len(population)}")
-        print(f"time since start: {time.time() - start}")
+def main():
+    args = parseArgs()
+    np.random.seed(args.seed)
 
-    # If there are now popSize or fewer, don't kill anyone
-    if len(population) <= popSize:
-        continue
+    # Create original shape
+    original = createOriginal()
 
-    # Kill until population size is 50 or less
-    del population[popSize:-1]
+    if args.hallway > 0:
+        hallway = Hallway(args.hallway)
+        halloffame = []
 
+        def record(hallway):
+            halloffame.append(hallway.toShape())
+            print(f"Hallway area: {hallway.area}, "
+                  f"shape area: {halloffame[-1].area}")
 
-fig = plt.figure()
-ax = fig.add_subplot()
+        hallway.optimize(callback=record)
+        population = [halloffame[-1]]
+    elif args.islands > 0:
+        # Islands imports this module
+        from Islands import evolveIslands
+        with HallOfFameWriter(args.halloffame) as recorder:
+            population, _ = evolveIslands(
+                original, args.generations, args.popsize, args.islands,
+                args.migrate_every, args.migrants, args.validator,
+                args.coarse, args.finest, recorder)
+        halloffame = HallOfFame(args.halloffame)
+    else:
+        # A resumed run adds to the telemetry of the run it continues
+        log = None
+        if args.telemetry is not None:
+            log = open(args.telemetry, 'a+' if args.resume else 'w')
+        with ValidityCache(args.cache, walker=args.validator) as cache, \
+                Evaluator(args.workers, cache, args.validator, args.coarse,
+                          args.finest) as evaluator, \
+                HallOfFameWriter(args.halloffame, args.resume) as recorder:
+            population, _ = evolve(
+                original, args.generations, args.popsize, evaluator, log,
+                args.checkpoint, args.checkpoint_every, args.resume,
+                recorder=recorder)
+        if log is not None:
+            log.close()
+        halloffame = HallOfFame(args.halloffame)
 
-# View hall of fame stuff
-def animate(i):
-    s = halloffame[i]
-    ax.clear()
-    plotShape(s, ax)
-    ax.set_title(f"Generation {i*10}")
-    ax.set_xlim(-1,3)
-    ax.set_ylim(1,-3)
+    if args.polish > 0:
+        with Evaluator(args.workers, validator=args.validator) as evaluator:
+            before = max(shape.area for shape in population)
+            population = polishPopulation(population, args.polish, evaluator)
+        print(f"Polished best area: {before} -> {population[0].area}")
 
-anim = FuncAnimation(fig, animate, frames=len(halloffame), repeat_delay=1000)
+    if len(halloffame) > 0:
+        saveHallOfFame(halloffame, workers=args.workers)
+    else:
+        print("The hall of fame is empty, not saving hof.gif")
 
-# Set up formatting for the movie files
-Writer = animation.writers['imagemagick']
-writer = Writer(fps=5, bitrate=1800)
+    # The polished best if there is one, or the best of the last
+    # population if nothing was recorded
+    if args.polish > 0 or len(halloffame) == 0:
+        if len(population) == 0:
+            print("No valid shape is left, not saving walk.gif")
+            return
+        best = population[0]
+    else:
+        best = halloffame[-1]
+    # Animate the walk the validator took, the event walk for the others
+    base, _, step = args.validator.partition(':')
+    poss, rots = getWalk(best, stepped=base == 'stepped',
+                         step=float(step or 0.01))
 
-anim.save('hof.gif', writer=writer)
+    saveGif(renderWalk(best, poss, rots, args.workers), 'walk.gif', fps=15)
 
-poss, rots = getWalk(halloffame[-1])
 
-animateWalk(halloffame[-1], poss, rots)
+if __name__ == "__main__":
+    main()
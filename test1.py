@@ -3,7 +3,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 
-from Tester import moveSequence
+from PolygonValidTest import moveSequence
 from Polygon import Polygon
 
 plt.style.use('fivethirtyeight')
@@ -29,7 +29,7 @@ ys = list(np.linspace(0,-1.0,20)) + [-1.0, 0.2]
             #[0, -0.2, -0.5, -0.6, -0.7, -0.7, 0])
 p = Polygon(xs, ys)
 
-seq = moveSequence(p, [], 0)
+seq = moveSequence(p)
 
 
 def animate(i):